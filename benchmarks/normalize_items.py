@@ -0,0 +1,115 @@
+"""Time and allocations of decoding and normalizing result pages, per 1,000 items.
+
+Compares the old path (the whole page decoded with the stdlib json module into
+dicts, then dict-backed dataclass items) with the current one (only the used
+fields decoded with msgspec, then slotted items).
+
+    python benchmarks/normalize_items.py [--items 10000]
+"""
+import argparse
+import json
+import os
+import sys
+import time
+import tracemalloc
+from dataclasses import dataclass
+from datetime import datetime
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault("BOT_TOKEN", "benchmark")
+os.environ.setdefault("DATABASE_URL", "memory://")
+
+from search_results import decode_search_page
+from yahoo import YahooAuctionsChecker
+
+@dataclass
+class DictYahooAuctionItem:
+    id: str
+    stock: int = 1
+    price: int = 0
+    buyout_price: int = 0
+    title: str = ''
+    image_url: str = ''
+    message_id: int = 0
+    end_time: datetime = None
+    muted: bool = False
+
+def old_normalize(data: dict) -> DictYahooAuctionItem:
+    return DictYahooAuctionItem(
+        id=data.get('id'),
+        image_url=data.get('imageUrl'),
+        title=data.get('title', 'Unknown Title'),
+        price=int(data.get('price') or 0),
+        buyout_price=int(data.get('buyItNowPrice') or 0),
+    )
+
+def make_page(count: int) -> bytes:
+    """A page shaped like a fromjapan search response, extra fields included."""
+    items = [
+        {
+            "id": f"x{index:09d}",
+            "title": f"Listing number {index} with a reasonably long auction title",
+            "price": 1000 + index,
+            "buyItNowPrice": 5000 + index if index % 3 else None,
+            "imageUrl": f"https://auctions.c.yimg.jp/images.auctions.yahoo.co.jp/image/x{index:09d}.jpg",
+            "endTime": "2024-06-01T12:00:00+09:00",
+            "bids": index % 7,
+            "seller": {"id": f"seller{index % 100}", "rating": 99.5, "badges": ["fast", "trusted"]},
+            "categories": [{"id": 2084, "name": "Music"}, {"id": 22152, "name": "CDs"}],
+            "shipping": {"free": index % 2 == 0, "from": "Tokyo"},
+        }
+        for index in range(count)
+    ]
+    return json.dumps({"items": items, "count": count}).encode()
+
+def old_path(body: bytes) -> list:
+    return [old_normalize(data) for data in json.loads(body)["items"]]
+
+def result(coroutine):
+    """Run a coroutine that never suspends, without the overhead of an event loop."""
+    try:
+        coroutine.send(None)
+    except StopIteration as stop:
+        return stop.value
+    raise RuntimeError("coroutine suspended")
+
+def new_path(checker: YahooAuctionsChecker, body: bytes) -> list:
+    return [result(checker.normalize_item(data)) for data in decode_search_page(body).items]
+
+def measure(run, count: int, repeat: int) -> tuple:
+    run()
+    started = time.perf_counter()
+    for _ in range(repeat):
+        run()
+    seconds = (time.perf_counter() - started) / repeat
+
+    tracemalloc.start()
+    items = run()
+    retained, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del items
+
+    per_thousand = 1000 / count
+    return seconds * 1000 * per_thousand, retained * per_thousand / 1024, peak * per_thousand / 1024
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--items", type=int, default=10000)
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    body = make_page(args.items)
+    # normalize_item doesn't touch the checker's state, so it's built without __init__
+    checker = YahooAuctionsChecker.__new__(YahooAuctionsChecker)
+
+    print(f"{args.items} items, {len(body) / 1024:.0f} KiB page, per 1,000 items:")
+    print(f"{'':18}{'time (ms)':>12}{'retained (KiB)':>16}{'peak (KiB)':>12}")
+    for name, run in (
+        ("json + dataclass", lambda: old_path(body)),
+        ("msgspec + slots", lambda: new_path(checker, body)),
+    ):
+        milliseconds, retained, peak = measure(run, args.items, args.repeat)
+        print(f"{name:18}{milliseconds:>12.2f}{retained:>16.1f}{peak:>12.1f}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,120 @@
+import os
+import random
+import time
+from logging import info, warning
+
+class CircuitOpenError(Exception):
+    """Raised instead of sending a request to a source whose circuit is open."""
+    def __init__(self, source: str, retry_at: float):
+        super().__init__(f"Circuit for {source} is open")
+        self.source = source
+        self.retry_at = retry_at
+
+class CircuitBreaker:
+    """Closed/open/half-open breaker for one source.
+
+    After CIRCUIT_FAILURE_THRESHOLD consecutive failed requests the circuit
+    opens and requests are refused until the reset timeout passes. Then one
+    probe request is let through (half-open). A successful probe closes the
+    circuit, a failed one opens it again with a doubled timeout, up to
+    CIRCUIT_MAX_RESET_TIMEOUT.
+    """
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half-open"
+
+    def __init__(self, source: str):
+        self.source = source
+        self.state = self.CLOSED
+        self.failures = 0
+        self.opened_at = 0.0
+        self.probe_in_flight = False
+        self.failure_threshold = int(os.getenv("CIRCUIT_FAILURE_THRESHOLD", "5"))
+        self.base_reset_timeout = float(os.getenv("CIRCUIT_RESET_TIMEOUT", "60"))
+        self.max_reset_timeout = float(os.getenv("CIRCUIT_MAX_RESET_TIMEOUT", "900"))
+        self.reset_timeout = self.base_reset_timeout
+
+    @property
+    def retry_at(self) -> float:
+        return self.opened_at + self.reset_timeout
+
+    def is_open(self) -> bool:
+        """Whether requests would currently be refused, without claiming the half-open probe."""
+        if self.state == self.OPEN:
+            return time.monotonic() < self.retry_at
+        return self.state == self.HALF_OPEN and self.probe_in_flight
+
+    def allow_request(self) -> bool:
+        if self.state == self.CLOSED:
+            return True
+
+        if self.state == self.OPEN:
+            if time.monotonic() < self.retry_at:
+                return False
+            info(f"[{self.__class__.__name__}] {self.source} half-open, sending a probe request")
+            self.state = self.HALF_OPEN
+            self.probe_in_flight = False
+
+        if self.probe_in_flight:
+            return False
+        self.probe_in_flight = True
+        return True
+
+    def record_success(self) -> None:
+        if self.state != self.CLOSED:
+            info(f"[{self.__class__.__name__}] {self.source} recovered, closing circuit")
+        self.state = self.CLOSED
+        self.failures = 0
+        self.probe_in_flight = False
+        self.reset_timeout = self.base_reset_timeout
+
+    def record_failure(self) -> None:
+        self.failures += 1
+        if self.state == self.HALF_OPEN:
+            self.reset_timeout = min(self.max_reset_timeout, self.reset_timeout * 2)
+            self.open()
+        elif self.state == self.CLOSED and self.failures >= self.failure_threshold:
+            self.open()
+
+    def open(self) -> None:
+        self.state = self.OPEN
+        self.opened_at = time.monotonic()
+        self.probe_in_flight = False
+        warning(f"[{self.__class__.__name__}] {self.source} failing, opening circuit for {self.reset_timeout:.0f}s")
+
+class RetryBudget:
+    """Caps retries at a fraction of the requests sent to a source.
+
+    Every request earns RETRY_BUDGET_RATIO of a retry and every retry spends a
+    whole one, so during an outage retries can't multiply the load.
+    """
+    def __init__(self):
+        self.ratio = float(os.getenv("RETRY_BUDGET_RATIO", "0.2"))
+        self.maximum = float(os.getenv("RETRY_BUDGET_MAX", "10"))
+        self.balance = self.maximum
+
+    def record_request(self) -> None:
+        self.balance = min(self.maximum, self.balance + self.ratio)
+
+    def try_spend(self) -> bool:
+        if self.balance < 1:
+            return False
+        self.balance -= 1
+        return True
+
+def retry_delay(attempt: int) -> float:
+    """Exponential backoff with full jitter."""
+    return random.uniform(0, float(os.getenv("RETRY_BACKOFF", "1")) * 2 ** attempt)
+
+_breakers = {}
+_retry_budgets = {}
+
+def breaker_for(source: str) -> CircuitBreaker:
+    if source not in _breakers:
+        _breakers[source] = CircuitBreaker(source)
+    return _breakers[source]
+
+def retry_budget_for(source: str) -> RetryBudget:
+    if source not in _retry_budgets:
+        _retry_budgets[source] = RetryBudget()
+    return _retry_budgets[source]
@@ -1,6 +1,6 @@
 import lightbulb
 from commands.base import BaseCommand
-from models import Alert
+import repositories
 
 class AlertsCommand(BaseCommand):
     def register(self):
@@ -8,9 +8,9 @@ class AlertsCommand(BaseCommand):
         @lightbulb.command("alerts", "List alerts for current channel")
         @lightbulb.implements(lightbulb.SlashCommand)
         async def alerts(ctx: lightbulb.SlashContext) -> None:
-            alerts = Alert.select().where(Alert.channel_id == ctx.channel_id)
+            alerts = await repositories.alerts.by_channel(ctx.channel_id)
 
-            if all(False for _ in alerts):
+            if not alerts:
                 await ctx.respond("You have no alerts in this channel!")
                 return
 
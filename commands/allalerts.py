@@ -1,6 +1,6 @@
 import lightbulb
 from commands.base import BaseCommand
-from models import Alert
+import repositories
 from lightbulb.utils import pag, nav
 
 class AllAlertsCommand(BaseCommand):
@@ -10,7 +10,7 @@ class AllAlertsCommand(BaseCommand):
         @lightbulb.implements(lightbulb.SlashCommand)
         async def allalerts(ctx: lightbulb.SlashContext) -> None:
             # Fetch all alerts and group them by channel_id
-            alerts = Alert.select().order_by(Alert.channel_id)
+            alerts = await repositories.alerts.all_by_channel()
             if not alerts:
                 await ctx.respond("You have no alerts!")
                 return
@@ -1,8 +1,8 @@
 import lightbulb
 import hikari
 from commands.base import BaseCommand
-from models import Filter, Alert
-from peewee import fn, JOIN
+import repositories
+from filters.engine import filter_cache
 
 class FilterCommands(BaseCommand):
     def register(self):
@@ -10,9 +10,11 @@ class FilterCommands(BaseCommand):
             if not isinstance(option.value, str):
                 option.value = str(option.value)
 
-            alerts = Alert.select(Alert.search_query).where(Alert.search_query.contains(option.value)).limit(25)
+            return await repositories.alerts.search(option.value)
 
-            return [alert.search_query for alert in alerts]
+        async def _filter_id_autocomplete(option: hikari.CommandInteractionOption, interaction: hikari.AutocompleteInteraction):
+            filter_ids = await repositories.filters.ids()
+            return [filter_id for filter_id in filter_ids if str(filter_id).startswith(str(option.value or ""))][:25]
 
         # Get all alerts and create a list of the search query values
         @self.bot.command
@@ -25,11 +27,7 @@ class FilterCommands(BaseCommand):
         @lightbulb.command("list", "List search queries with filters configured")
         @lightbulb.implements(lightbulb.SlashSubCommand)
         async def list(ctx: lightbulb.SlashContext) -> None:
-            query = (Alert
-                     .select(Alert, fn.Count(Filter.id).alias('filter_count'))
-                     .join(Filter, JOIN.LEFT_OUTER)
-                     .group_by(Alert)
-                     .having(fn.Count(Filter.id) > 0))
+            query = await repositories.alerts.with_filter_counts()
 
             # Process the results
             if not query:
@@ -49,22 +47,17 @@ class FilterCommands(BaseCommand):
         @lightbulb.command("get", "List all filters", pass_options=True)
         @lightbulb.implements(lightbulb.SlashSubCommand)
         async def get(ctx: lightbulb.SlashContext, search_query: str) -> None:
-            # Combine query to fetch alert and related filters in one go
-            alert = (Alert
-                    .select()
-                    .join(Filter, JOIN.LEFT_OUTER)
-                    .where(Alert.search_query == search_query)
-                    .group_by(Alert)
-                    .having(fn.Count(Filter.id) > 0)).get_or_none()
+            alert = await repositories.alerts.find_by_query(search_query)
+            alert_filters = await repositories.filters.for_alert(alert.id) if alert else []
             
             # Check if any filters are returned, indicating the alert exists
-            if not alert:
+            if not alert_filters:
                 await ctx.respond(f"Alert for **{search_query}** does not exist or has no filters!")
                 return
             
             # Build the response message with filter details and a header
             message = f"Filters for **{search_query}**:\n"
-            for filter in alert.filters:
+            for filter in alert_filters:
                 message += f"- **{filter.id}** - {filter.type} - **{filter.value}** - {'Blacklist' if filter.inverse else 'Whitelist'}\n"
         
             await ctx.respond(message)
@@ -103,26 +96,27 @@ class FilterCommands(BaseCommand):
             method: str,
             type: str,
         ) -> None:
-            alert = Alert.select().where(Alert.search_query == search_query).get_or_none()
+            alert = await repositories.alerts.find_by_query(search_query)
             if alert is None:
                 await ctx.respond(f"Alert for **{search_query}** does not exist!")
                 return
             
-            filter = Filter.create(
-                alert=alert,
-                type=type,
+            filter = await repositories.filters.create(
+                alert_id=alert.id,
+                type=method,
                 value=value,
                 inverse=type == "blacklist",
             )
+            filter_cache.invalidate(alert.id)
+            if ctx.bot.d.scheduler:
+                ctx.bot.d.scheduler.invalidate_filters(alert.id)
             await ctx.respond(f"Registered filter with id **{filter.id}** for **{search_query}**!")
 
-        filter_ids = Filter.select(Filter.id)
         @filters.child
-        # Method must be one of the following: "regex", "text"
         @lightbulb.option(
             "id", "Filter ID to delete", 
             required=True,
-            choices=[filter.id for filter in filter_ids],
+            autocomplete=_filter_id_autocomplete,
             type=int,
         )
         @lightbulb.command(
@@ -130,11 +124,14 @@ class FilterCommands(BaseCommand):
         )
         @lightbulb.implements(lightbulb.SlashSubCommand)
         async def delete(ctx: lightbulb.SlashContext, id: int) -> None:
-            filter = Filter.select().where(Filter.id == ctx.options.id).get_or_none()
+            filter = await repositories.filters.find(ctx.options.id)
             if filter is None:
                 await ctx.respond(f"Filter with id **{ctx.options.id}** does not exist!")
                 return
            
-            filter.delete_instance()
+            await repositories.filters.delete(filter.id)
+            filter_cache.invalidate(filter.alert_id)
+            if ctx.bot.d.scheduler:
+                ctx.bot.d.scheduler.invalidate_filters(filter.alert_id)
             await ctx.respond(f"Deleted filter with id **{filter.id}**")
 
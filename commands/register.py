@@ -1,6 +1,6 @@
 import lightbulb
 from commands.base import BaseCommand
-from models import Alert
+import repositories
 class RegisterCommand(BaseCommand):
     def register(self):
         @self.bot.command
@@ -10,12 +10,16 @@ class RegisterCommand(BaseCommand):
         )
         @lightbulb.implements(lightbulb.SlashCommand)
         async def register(ctx: lightbulb.SlashContext, search_query: str) -> None:
-            if Alert().select().where(Alert.search_query == search_query).exists():
+            if await repositories.alerts.exists(search_query):
                 await ctx.respond(f"Alert for **{search_query}** already exists!")
+                return
 
-            alert = Alert.create(
+            alert = await repositories.alerts.create(
                 channel_id=ctx.channel_id,
                 search_query=search_query,
             )
 
+            if ctx.bot.d.scheduler:
+                ctx.bot.d.scheduler.add_alert(alert)
+
             await ctx.respond(f"Registered alert for **{search_query}**!")
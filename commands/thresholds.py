@@ -0,0 +1,91 @@
+import lightbulb
+import hikari
+from typing import Optional
+from commands.base import BaseCommand
+import repositories
+from snapshot import Thresholds
+
+class ThresholdCommands(BaseCommand):
+    def register(self):
+        async def _search_query_autocomplete(option: hikari.CommandInteractionOption, interaction: hikari.AutocompleteInteraction):
+            if not isinstance(option.value, str):
+                option.value = str(option.value)
+
+            return await repositories.alerts.search(option.value)
+
+        @self.bot.command
+        @lightbulb.command("thresholds", "Manage when item updates are posted")
+        @lightbulb.implements(lightbulb.SlashCommandGroup)
+        async def thresholds(_: lightbulb.SlashContext) -> None:
+            pass
+
+        @thresholds.child
+        @lightbulb.option(
+            "search_query", "Which search query to show thresholds for",
+            required=True,
+            autocomplete=_search_query_autocomplete,
+        )
+        @lightbulb.command("get", "Show the update thresholds of an alert", pass_options=True)
+        @lightbulb.implements(lightbulb.SlashSubCommand)
+        async def get(ctx: lightbulb.SlashContext, search_query: str) -> None:
+            alert = await repositories.alerts.find_by_query(search_query)
+            if alert is None:
+                await ctx.respond(f"Alert for **{search_query}** does not exist!")
+                return
+
+            current = Thresholds.for_alert(await repositories.thresholds.for_alert(alert.id))
+            await ctx.respond(
+                f"Thresholds for **{search_query}**:\n"
+                f"- Stock changes are posted from a stock of **{current.min_stock}**\n"
+                f"- Price drops are posted above **¥{current.price_drop}**\n"
+                f"- Buyout price changes are posted above **¥{current.buyout_change}**"
+            )
+
+        @thresholds.child
+        @lightbulb.option(
+            "search_query", "Which search query to set thresholds for",
+            required=True,
+            autocomplete=_search_query_autocomplete,
+        )
+        @lightbulb.option("min_stock", "Lowest new stock for which a stock change is posted", type=int, required=False, min_value=0)
+        @lightbulb.option("price_drop", "Price drops up to this many yen are not posted", type=int, required=False, min_value=0)
+        @lightbulb.option("buyout_change", "Buyout price changes up to this many yen are not posted", type=int, required=False, min_value=0)
+        @lightbulb.command("set", "Change the update thresholds of an alert; options left out keep their value", pass_options=True)
+        @lightbulb.implements(lightbulb.SlashSubCommand)
+        async def set(
+            ctx: lightbulb.SlashContext,
+            search_query: str,
+            min_stock: Optional[int],
+            price_drop: Optional[int],
+            buyout_change: Optional[int],
+        ) -> None:
+            alert = await repositories.alerts.find_by_query(search_query)
+            if alert is None:
+                await ctx.respond(f"Alert for **{search_query}** does not exist!")
+                return
+
+            existing = await repositories.thresholds.for_alert(alert.id)
+            if existing is not None:
+                min_stock = existing.min_stock if min_stock is None else min_stock
+                price_drop = existing.price_drop if price_drop is None else price_drop
+                buyout_change = existing.buyout_change if buyout_change is None else buyout_change
+
+            await repositories.thresholds.save(alert.id, min_stock, price_drop, buyout_change)
+            await ctx.respond(f"Updated thresholds for **{search_query}**!")
+
+        @thresholds.child
+        @lightbulb.option(
+            "search_query", "Which search query to reset thresholds for",
+            required=True,
+            autocomplete=_search_query_autocomplete,
+        )
+        @lightbulb.command("reset", "Go back to the default update thresholds", pass_options=True)
+        @lightbulb.implements(lightbulb.SlashSubCommand)
+        async def reset(ctx: lightbulb.SlashContext, search_query: str) -> None:
+            alert = await repositories.alerts.find_by_query(search_query)
+            if alert is None:
+                await ctx.respond(f"Alert for **{search_query}** does not exist!")
+                return
+
+            await repositories.thresholds.delete(alert.id)
+            await ctx.respond(f"Thresholds for **{search_query}** reset to the defaults!")
@@ -1,6 +1,6 @@
 import lightbulb
 from commands.base import BaseCommand
-from models import Alert
+import repositories
 import hikari
 
 class UnregisterCommand(BaseCommand):
@@ -10,8 +10,7 @@ class UnregisterCommand(BaseCommand):
             if not isinstance(option.value, str):
                 option.value = str(option.value)
 
-            alerts = Alert.select(Alert.search_query).where(Alert.search_query.contains(option.value)).limit(25)
-            return [alert.search_query for alert in alerts]
+            return await repositories.alerts.search(option.value)
 
         @self.bot.command
         @lightbulb.option(
@@ -25,12 +24,13 @@ class UnregisterCommand(BaseCommand):
         )
         @lightbulb.implements(lightbulb.SlashCommand)
         async def unregister(ctx: lightbulb.SlashContext, search_query: str) -> None:
-            try:
-                alert = Alert.get(Alert.search_query == search_query)
-            except Alert.DoesNotExist:
+            alert = await repositories.alerts.find_by_query(search_query)
+            if alert is None:
                 await ctx.respond(f"Alert for **{search_query}** does not exist!")
                 return
 
             # Delete the alert
-            alert.delete_instance()
+            await repositories.alerts.delete(alert.id)
+            if ctx.bot.d.scheduler:
+                ctx.bot.d.scheduler.remove_alert(alert.id)
             await ctx.respond(f"Unregistered alert for **{search_query}**!")
@@ -0,0 +1,166 @@
+import asyncio
+import itertools
+import os
+from collections import Counter
+from dataclasses import dataclass
+from logging import warning, error
+from hikari import Embed
+from lightbulb import BotApp
+import repositories
+from item_components import item_buttons
+from direct_messages import DirectMessenger, MAX_EMBEDS
+from message_index import message_index
+
+# Lower values are delivered first
+NEW_ITEM = 0
+ITEM_UPDATE = 1
+
+@dataclass
+class OutboundPost:
+    priority: int
+    channel_id: int
+    alert_id: int
+    item_id: str
+    embed: Embed
+    # DM the users that asked to be notified about this item
+    notify: bool = False
+
+@dataclass
+class UpdateDigest:
+    """Several update posts for one alert, sent as a single multi-embed message."""
+    channel_id: int
+    alert_id: int
+    posts: list
+
+@dataclass
+class ChannelNotice:
+    """A plain text message to a channel, not tied to an item."""
+    channel_id: int
+    content: str
+
+class DeliveryQueue:
+    """Posts alerts to Discord outside of the scraping path.
+
+    Every channel has its own bounded priority queue drained by a single task,
+    so posts to one channel follow that channel's route bucket in order while
+    other channels keep going. New items are posted before updates. At most
+    DELIVERY_WORKERS posts are sent at the same time across all channels. When
+    a channel has DELIVERY_QUEUE_SIZE posts waiting, ``enqueue`` waits for room.
+    Once a post is sent its message id is written back to the item store and
+    the users following the item are notified through the DirectMessenger.
+
+    With DIGEST_WINDOW set, updates are held back per alert for that many
+    seconds and then sent together, up to MAX_EMBEDS per message. Only the
+    latest update of an item within the window is kept. New items are never
+    delayed.
+    """
+    def __init__(self, bot: BotApp):
+        self.bot = bot
+        self.messenger = DirectMessenger(bot)
+        self.queues = {}
+        self.workers = {}
+        self.digests = {}
+        self.digest_tasks = {}
+        self.sequence = itertools.count()
+        self.queue_size = int(os.getenv("DELIVERY_QUEUE_SIZE", "500"))
+        self.slots = asyncio.Semaphore(int(os.getenv("DELIVERY_WORKERS", "4")))
+        self.digest_window = float(os.getenv("DIGEST_WINDOW", "0"))
+        self.stats = Counter()
+
+    async def enqueue(self, post: OutboundPost) -> None:
+        if post.priority == ITEM_UPDATE and self.digest_window > 0:
+            key = (post.channel_id, post.alert_id)
+            if key not in self.digests:
+                self.digests[key] = {}
+                self.digest_tasks[key] = asyncio.create_task(self.flush_digest(key))
+            self.digests[key][post.item_id] = post
+            return
+
+        await self.put(post.channel_id, post.priority, post)
+
+    async def put(self, channel_id: int, priority: int, post) -> None:
+        if channel_id not in self.queues:
+            self.queues[channel_id] = asyncio.PriorityQueue(self.queue_size)
+            self.workers[channel_id] = asyncio.create_task(self.worker(channel_id))
+
+        # The sequence keeps posts of the same priority in order
+        await self.queues[channel_id].put((priority, next(self.sequence), post))
+        self.stats["queued"] += 1
+
+    async def enqueue_notice(self, channel_id: int, content: str) -> None:
+        await self.put(channel_id, NEW_ITEM, ChannelNotice(channel_id, content))
+
+    async def flush_digest(self, key: tuple) -> None:
+        await asyncio.sleep(self.digest_window)
+        del self.digest_tasks[key]
+        posts = list(self.digests.pop(key).values())
+        channel_id, alert_id = key
+
+        if len(posts) == 1:
+            await self.put(channel_id, ITEM_UPDATE, posts[0])
+            return
+
+        for start in range(0, len(posts), MAX_EMBEDS):
+            await self.put(channel_id, ITEM_UPDATE, UpdateDigest(channel_id, alert_id, posts[start:start + MAX_EMBEDS]))
+
+    async def worker(self, channel_id: int) -> None:
+        queue = self.queues[channel_id]
+        while True:
+            _, _, post = await queue.get()
+            try:
+                async with self.slots:
+                    if isinstance(post, UpdateDigest):
+                        await self.deliver_digest(post)
+                    elif isinstance(post, ChannelNotice):
+                        await self.bot.rest.create_message(post.channel_id, post.content)
+                    else:
+                        await self.deliver(post)
+                self.stats["sent"] += 1
+            except Exception as e:
+                self.stats["failed"] += 1
+                error(f"[{self.__class__.__name__}] Failed to post to {channel_id}: {e}", exc_info=True)
+            finally:
+                queue.task_done()
+
+    async def deliver(self, post: OutboundPost) -> None:
+        message = await self.bot.rest.create_message(post.channel_id, embed=post.embed, component=item_buttons(self.bot.rest, post.item_id))
+        id = await repositories.items.set_message_id(post.item_id, message.id)
+        if id is not None:
+            message_index.add(message.id, id, post.item_id, post.embed.title, post.channel_id, post.alert_id)
+
+        if post.notify:
+            await self.messenger.notify_item(post.item_id, post.embed)
+
+    async def deliver_digest(self, digest: UpdateDigest) -> None:
+        # A digest covers several items, so it gets no buttons and the items
+        # keep pointing at the message that announced them.
+        await self.bot.rest.create_message(digest.channel_id, embeds=[post.embed for post in digest.posts])
+        self.stats["digested"] += len(digest.posts)
+
+        for post in digest.posts:
+            if post.notify:
+                await self.messenger.notify_item(post.item_id, post.embed)
+
+    def pending(self) -> int:
+        return sum(queue.qsize() for queue in self.queues.values()) + sum(len(posts) for posts in self.digests.values())
+
+    async def close(self) -> None:
+        pending = self.pending()
+        if pending:
+            warning(f"[{self.__class__.__name__}] Dropping {pending} unsent posts")
+
+        tasks = [*self.digest_tasks.values(), *self.workers.values()]
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        self.digest_tasks.clear()
+        self.digests.clear()
+        self.workers.clear()
+        self.queues.clear()
+        await self.messenger.close()
+
+    def describe_stats(self) -> str:
+        return (
+            f"queued={self.stats['queued']}, sent={self.stats['sent']}, failed={self.stats['failed']}, "
+            f"digested={self.stats['digested']}, pending={self.pending()}, channels={len(self.queues)}"
+        )
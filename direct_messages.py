@@ -0,0 +1,99 @@
+import asyncio
+import os
+import time
+from collections import Counter, OrderedDict
+from logging import warning, error
+import hikari
+import repositories
+
+# Discord accepts at most this many embeds in one message
+MAX_EMBEDS = 10
+
+class DmChannelCache:
+    """Remembers the DM channel of recently messaged users.
+
+    Entries expire after DM_CHANNEL_CACHE_TTL seconds and only the
+    DM_CHANNEL_CACHE_SIZE most recently used are kept.
+    """
+    def __init__(self, max_size: int, ttl: float):
+        self.max_size = max_size
+        self.ttl = ttl
+        self.channels = OrderedDict()
+
+    async def get(self, rest: hikari.api.RESTClient, user_id: int) -> int:
+        # Notifications store user ids as text, events carry snowflakes
+        user_id = int(user_id)
+        entry = self.channels.get(user_id)
+        if entry is not None and entry[1] > time.monotonic():
+            self.channels.move_to_end(user_id)
+            return entry[0]
+
+        channel = await rest.create_dm_channel(user_id)
+        self.channels[user_id] = (channel.id, time.monotonic() + self.ttl)
+        self.channels.move_to_end(user_id)
+        while len(self.channels) > self.max_size:
+            self.channels.popitem(last=False)
+        return channel.id
+
+    def invalidate(self, user_id: int) -> None:
+        self.channels.pop(int(user_id), None)
+
+dm_channels = DmChannelCache(
+    int(os.getenv("DM_CHANNEL_CACHE_SIZE", "1000")),
+    float(os.getenv("DM_CHANNEL_CACHE_TTL", "3600")),
+)
+
+class DirectMessenger:
+    """Sends item notifications to the users following those items.
+
+    Notifications are collected per user for DM_BATCH_WINDOW seconds, so a
+    user following several items that change in the same check gets one
+    message with all of them. Users are messaged concurrently, at most
+    DM_CONCURRENCY at a time. A failure for one user (e.g. closed DMs) is
+    logged and doesn't affect the others.
+    """
+    def __init__(self, bot):
+        self.bot = bot
+        self.pending = {}
+        self.flush_task = None
+        self.batch_window = float(os.getenv("DM_BATCH_WINDOW", "5"))
+        self.slots = asyncio.Semaphore(int(os.getenv("DM_CONCURRENCY", "4")))
+        self.stats = Counter()
+
+    async def notify_item(self, item_id: str, embed: hikari.Embed) -> None:
+        for user_id in await repositories.notifications.user_ids_for_item(item_id):
+            self.pending.setdefault(user_id, []).append(embed)
+
+        if self.pending and self.flush_task is None:
+            self.flush_task = asyncio.create_task(self.flush_later())
+
+    async def flush_later(self) -> None:
+        await asyncio.sleep(self.batch_window)
+        self.flush_task = None
+        pending, self.pending = self.pending, {}
+        await asyncio.gather(*(self.send(user_id, embeds) for user_id, embeds in pending.items()))
+
+    async def send(self, user_id: int, embeds: list) -> None:
+        try:
+            async with self.slots:
+                channel_id = await dm_channels.get(self.bot.rest, user_id)
+                for start in range(0, len(embeds), MAX_EMBEDS):
+                    await self.bot.rest.create_message(channel_id, embeds=embeds[start:start + MAX_EMBEDS])
+            self.stats["sent"] += 1
+        except hikari.ForbiddenError:
+            self.stats["failed"] += 1
+            warning(f"[{self.__class__.__name__}] Can't DM user {user_id}, their DMs are closed")
+        except Exception as e:
+            self.stats["failed"] += 1
+            dm_channels.invalidate(user_id)
+            error(f"[{self.__class__.__name__}] Failed to DM user {user_id}: {e}", exc_info=True)
+
+    async def close(self) -> None:
+        if self.flush_task is not None:
+            self.flush_task.cancel()
+            await asyncio.gather(self.flush_task, return_exceptions=True)
+            self.flush_task = None
+        self.pending.clear()
+
+    def describe_stats(self) -> str:
+        return f"sent={self.stats['sent']}, failed={self.stats['failed']}, pending_users={len(self.pending)}, cached_channels={len(dm_channels.channels)}"
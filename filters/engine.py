@@ -0,0 +1,79 @@
+import re
+from logging import warning
+from typing import Optional, Tuple
+from filters.re_filter import RegexFilter
+from filters.text_filter import TextFilter
+import repositories
+
+class FilterSet:
+    """Filters of one kind (whitelist or blacklist) compiled into two matchers."""
+    def __init__(self, filters: list):
+        regex_filters = []
+        text_filters = []
+        for filter in filters:
+            if filter.type != "regex":
+                text_filters.append(filter)
+                continue
+
+            try:
+                re.compile(filter.value)
+                regex_filters.append(filter)
+            except re.error as e:
+                warning(f"[{self.__class__.__name__}] Ignoring invalid regex filter {filter.id} ({filter.value}): {e}")
+
+        self.regex_ids = [filter.id for filter in regex_filters]
+        self.regex = RegexFilter([filter.value for filter in regex_filters])
+        self.text_ids = [filter.id for filter in text_filters]
+        self.text = TextFilter([filter.value for filter in text_filters])
+
+    def __bool__(self) -> bool:
+        return bool(self.regex_ids or self.text_ids)
+
+    def search(self, title: str) -> Optional[int]:
+        """Return the id of a filter matching the title, or None."""
+        if self.text_ids:
+            index = self.text.search(title)
+            if index is not None:
+                return self.text_ids[index]
+
+        if self.regex_ids:
+            index = self.regex.search(title)
+            if index is not None:
+                return self.regex_ids[index]
+
+        return None
+
+class AlertFilters:
+    """All filters of one alert. Blacklist filters reject an item, and when an
+    alert has whitelist filters an item must match at least one of them."""
+    def __init__(self, filters: list):
+        self.whitelist = FilterSet([filter for filter in filters if not filter.inverse])
+        self.blacklist = FilterSet([filter for filter in filters if filter.inverse])
+
+    def check(self, title: str) -> Tuple[bool, Optional[int]]:
+        """Return whether the item is accepted and the id of the filter that decided it, if any."""
+        title = title or ""
+        blocked_by = self.blacklist.search(title)
+        if blocked_by is not None:
+            return False, blocked_by
+
+        if not self.whitelist:
+            return True, None
+
+        allowed_by = self.whitelist.search(title)
+        return allowed_by is not None, allowed_by
+
+class FilterCache:
+    """Compiled filters per alert. Entries are dropped when an alert's filters change."""
+    def __init__(self):
+        self.compiled = {}
+
+    async def get(self, alert_id: int) -> AlertFilters:
+        if alert_id not in self.compiled:
+            self.compiled[alert_id] = AlertFilters(await repositories.filters.for_alert(alert_id))
+        return self.compiled[alert_id]
+
+    def invalidate(self, alert_id: int) -> None:
+        self.compiled.pop(alert_id, None)
+
+filter_cache = FilterCache()
@@ -1,12 +1,32 @@
 import re
+from typing import Optional
+
+NUMBERED_BACKREFERENCE = re.compile(r"\\[1-9]")
 
 class RegexFilter:
     def __init__(self, patterns: list):
-        self.pattersn = patterns = [re.compile(pattern) for pattern in patterns]
+        self.patterns = [re.compile(pattern) for pattern in patterns]
+
+        # One alternation with a named group per pattern finds the first match in
+        # a single scan. Patterns that can't be combined (inline global flags,
+        # numbered backreferences) fall back to being searched one by one.
+        self.combined = None
+        if self.patterns and not any(NUMBERED_BACKREFERENCE.search(pattern.pattern) for pattern in self.patterns):
+            try:
+                self.combined = re.compile("|".join(f"(?P<p{index}>{pattern.pattern})" for index, pattern in enumerate(self.patterns)))
+            except re.error:
+                pass
+
+    def search(self, input_text: str) -> Optional[int]:
+        """Return the index of the first pattern matching the text, or None."""
+        if self.combined is not None:
+            match = self.combined.search(input_text)
+            return int(match.lastgroup[1:]) if match else None
+
+        for index, pattern in enumerate(self.patterns):
+            if pattern.search(input_text):
+                return index
+        return None
     
     def match(self, input_text: str) -> bool:
-        for pattern in self.patterns:
-            if pattern.search(input_text):
-                return True
-        return False
-            
\ No newline at end of file
+        return self.search(input_text) is not None
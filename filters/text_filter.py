@@ -1,9 +1,67 @@
+from collections import deque
+from typing import Optional
+
 class TextFilter:
+    """Case-insensitive multi-term substring matcher.
+
+    The terms are compiled into an Aho-Corasick automaton, so a title is
+    scanned once no matter how many terms there are.
+    """
     def __init__(self, search_terms: list):
         self.search_terms = search_terms
+        self.transitions = [{}]
+        self.failure = [0]
+        # Index of the term reported when the scan reaches each state
+        self.output = [None]
+
+        for index, term in enumerate(search_terms):
+            self._add_term(index, term.casefold())
+        self._link_failures()
+
+    def _add_term(self, index: int, term: str) -> None:
+        if not term:
+            return
+
+        state = 0
+        for char in term:
+            next_state = self.transitions[state].get(char)
+            if next_state is None:
+                next_state = len(self.transitions)
+                self.transitions[state][char] = next_state
+                self.transitions.append({})
+                self.failure.append(0)
+                self.output.append(None)
+            state = next_state
+
+        if self.output[state] is None:
+            self.output[state] = index
+
+    def _link_failures(self) -> None:
+        queue = deque(self.transitions[0].values())
+        while queue:
+            state = queue.popleft()
+            for char, child in self.transitions[state].items():
+                queue.append(child)
+
+                fallback = self.failure[state]
+                while fallback and char not in self.transitions[fallback]:
+                    fallback = self.failure[fallback]
+
+                target = self.transitions[fallback].get(char, 0)
+                self.failure[child] = target if target != child else 0
+                if self.output[child] is None:
+                    self.output[child] = self.output[self.failure[child]]
+
+    def search(self, input_text: str) -> Optional[int]:
+        """Return the index of the first term found in the text, or None."""
+        state = 0
+        for char in input_text.casefold():
+            while state and char not in self.transitions[state]:
+                state = self.failure[state]
+            state = self.transitions[state].get(char, 0)
+            if self.output[state] is not None:
+                return self.output[state]
+        return None
     
     def match(self, input_text: str) -> bool:
-        for term in self.search_terms:
-            if term in input_text:
-                return True
-        return False
\ No newline at end of file
+        return self.search(input_text) is not None
@@ -2,6 +2,17 @@ from abc import ABC, abstractmethod
 import hikari
 
 class EventHandler(ABC):
+    bot_user_id = None
+
+    def is_own_event(self, user_id: int, bot) -> bool:
+        """Whether the event was caused by the bot itself. The bot user is looked up once."""
+        if EventHandler.bot_user_id is None:
+            me = bot.get_me()
+            if me is None:
+                return False
+            EventHandler.bot_user_id = me.id
+        return user_id == EventHandler.bot_user_id
+
     @abstractmethod
     async def handle(self, event: hikari.Event, bot) -> None:
         pass
\ No newline at end of file
@@ -0,0 +1,37 @@
+# handlers/hikari_event/component_interaction.py
+import hikari
+from .base import EventHandler
+import item_components
+import repositories
+from message_index import message_index
+from strategies.components.delete_item import DeleteItemStrategy
+from strategies.components.toggle_notification import ToggleNotificationStrategy
+from logging import info, warning
+
+class ComponentInteractionHandler(EventHandler):
+    def __init__(self):
+        self.action_strategies = {
+            item_components.DELETE: DeleteItemStrategy(),
+            item_components.NOTIFY: ToggleNotificationStrategy(),
+        }
+
+    async def handle(self, event: hikari.InteractionCreateEvent, bot) -> None:
+        interaction = event.interaction
+        if not isinstance(interaction, hikari.ComponentInteraction):
+            return  # Commands are handled by lightbulb
+
+        parsed = item_components.parse_custom_id(interaction.custom_id)
+        strategy = self.action_strategies.get(parsed[0]) if parsed else None
+        if strategy is None:
+            # Every interaction needs a response, or Discord shows it as failed
+            warning(f"[{self.__class__.__name__}] Unknown button {interaction.custom_id!r} clicked by {interaction.user.id}")
+            await interaction.create_initial_response(hikari.ResponseType.MESSAGE_CREATE, "This button is no longer supported.", flags=hikari.MessageFlag.EPHEMERAL)
+            return
+        action, item_id = parsed
+
+        info(f"[{self.__class__.__name__}] Button {action} by {interaction.user.id} for item {item_id}")
+        item = await message_index.find(interaction.message.id, interaction.channel_id)
+        if item is None or item.item_id != item_id:
+            # An older alert message, the index only follows the item's latest one
+            item = await repositories.items.find_by_id(item_id)
+        await strategy.execute(interaction, item, bot)
@@ -13,7 +13,7 @@ class ReactionDeleteHandler(EventHandler):
         }
 
     async def handle(self, event: hikari.ReactionDeleteEvent, bot) -> None:
-        if event.user_id == bot.get_me().id:
+        if self.is_own_event(event.user_id, bot):
             return  # Ignore reactions added by the bot
         info(f"[{self.__class__.__name__}] Reaction {event.emoji_name} deleted by {event.user_id} on message {event.message_id}")
         strategy = self.emoji_strategies.get(event.emoji_name)
@@ -0,0 +1,151 @@
+import os
+import asyncio
+import time
+import aiohttp
+from typing import Optional
+from logging import info
+from ratelimit import HostLimiters
+from httpcache import CachedPage, content_hash, create_http_cache
+
+class InvalidResponse(Exception):
+    """The response decoded, but isn't what the caller expected (e.g. an error body)."""
+
+async def read_response(response: aiohttp.ClientResponse) -> tuple:
+    return response.status, response.headers, await response.read()
+
+def parse_retry_after(value: Optional[str]) -> float:
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return 0
+
+class HttpClient:
+    """Long-lived, pooled HTTP client shared by every AlertChecker.
+
+    The bot owns a single instance, starts it when the gateway is starting
+    and closes it on shutdown. Connections are kept alive per host and DNS
+    lookups are cached, so a check cycle reuses the same sockets instead of
+    doing a TLS handshake per alert. Every request also passes through the
+    per-host rate and concurrency limiters.
+    """
+    def __init__(self):
+        self.session: Optional[aiohttp.ClientSession] = None
+        self.limiters = HostLimiters()
+        self.cache = create_http_cache()
+        self.stats = {
+            "requests": 0,
+            "connections_created": 0,
+            "connections_reused": 0,
+            "dns_cache_hits": 0,
+            "dns_cache_misses": 0,
+        }
+
+    async def start(self) -> None:
+        if self.session is not None:
+            return
+
+        await self.cache.open()
+        trace_config = aiohttp.TraceConfig()
+        trace_config.on_request_start.append(self._count("requests"))
+        trace_config.on_connection_create_end.append(self._count("connections_created"))
+        trace_config.on_connection_reuseconn.append(self._count("connections_reused"))
+        trace_config.on_dns_cache_hit.append(self._count("dns_cache_hits"))
+        trace_config.on_dns_cache_miss.append(self._count("dns_cache_misses"))
+
+        connector = aiohttp.TCPConnector(
+            limit=int(os.getenv("HTTP_POOL_SIZE", "100")),
+            limit_per_host=int(os.getenv("HTTP_POOL_SIZE_PER_HOST", "10")),
+            keepalive_timeout=float(os.getenv("HTTP_KEEPALIVE_TIMEOUT", "60")),
+            ttl_dns_cache=int(os.getenv("HTTP_DNS_CACHE_TTL", "300")),
+            use_dns_cache=True,
+            resolver=aiohttp.AsyncResolver(),
+        )
+        self.session = aiohttp.ClientSession(
+            connector=connector,
+            trace_configs=[trace_config],
+            timeout=aiohttp.ClientTimeout(total=float(os.getenv("HTTP_TIMEOUT", "30"))),
+        )
+        info(f"[{self.__class__.__name__}] Started HTTP connection pool")
+
+    async def close(self) -> None:
+        if self.session is None:
+            return
+
+        await self.session.close()
+        await self.cache.close()
+        self.session = None
+        info(f"[{self.__class__.__name__}] Closed HTTP connection pool ({self.describe_stats()})")
+
+    async def get_json(self, url: str, headers: dict = None):
+        return await self.request(url, headers, lambda response: response.json())
+
+    async def get_text(self, url: str, headers: dict = None) -> str:
+        return await self.request(url, headers, lambda response: response.text())
+
+    async def get_cached(self, source: str, key: str, url: str, headers: dict, decode) -> CachedPage:
+        """GET a page through the response cache.
+
+        The stored ETag/Last-Modified are sent along. On a 304, or a body identical
+        to the cached one, the cached page is returned without decoding anything.
+        New content is decoded with ``decode``, which raises when the body isn't
+        a valid page (turned into InvalidResponse), and cached.
+        """
+        entry = await self.cache.lookup(key)
+        request_headers = dict(headers or {})
+        if entry is not None:
+            if entry.etag:
+                request_headers["If-None-Match"] = entry.etag
+            if entry.last_modified:
+                request_headers["If-Modified-Since"] = entry.last_modified
+
+        status, response_headers, body = await self.request(url, request_headers, read_response)
+        if entry is not None and status == 304:
+            self.cache.count(source, "hit")
+            return CachedPage(key, entry.hash, entry.body, decode)
+
+        hash = content_hash(body)
+        if entry is not None and hash == entry.hash:
+            self.cache.count(source, "hit")
+            return CachedPage(key, entry.hash, entry.body, decode)
+
+        page = CachedPage(key, hash, body, decode)
+        if status != 200:
+            raise InvalidResponse(f"HTTP {status}: {body[:500]!r}")
+        try:
+            page.content()
+        except Exception as e:
+            raise InvalidResponse(f"{e}: {body[:500]!r}") from e
+
+        self.cache.count(source, "miss")
+        await self.cache.store(key, response_headers.get("ETag"), response_headers.get("Last-Modified"), hash, body)
+        return page
+
+    async def request(self, url: str, headers: dict, read):
+        limiter = self.limiters.for_url(url)
+        await limiter.acquire()
+
+        started = time.monotonic()
+        overloaded = False
+        retry_after = 0
+        try:
+            async with self.session.get(url, headers=headers) as response:
+                overloaded = response.status == 429 or response.status >= 500
+                if response.status == 429:
+                    retry_after = parse_retry_after(response.headers.get("Retry-After"))
+                return await read(response)
+        except (aiohttp.ClientConnectionError, asyncio.TimeoutError):
+            overloaded = True
+            raise
+        finally:
+            await limiter.release(time.monotonic() - started, overloaded, retry_after)
+
+    def describe_stats(self) -> str:
+        return ", ".join(f"{key}={value}" for key, value in self.stats.items())
+
+    def describe_limits(self) -> str:
+        return self.limiters.describe()
+
+    def _count(self, key: str):
+        async def on_trace_event(session, context, params):
+            self.stats[key] += 1
+        return on_trace_event
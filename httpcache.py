@@ -0,0 +1,170 @@
+import asyncio
+import functools
+import hashlib
+import os
+import sqlite3
+import time
+from collections import Counter, defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import Optional
+
+class CachedPage:
+    """A fetched response body and its content hash, decoded lazily and at most once with ``decode``."""
+    def __init__(self, key: str, hash: str, body: bytes, decode):
+        self.key = key
+        self.hash = hash
+        self.body = body
+        self.decode = decode
+        self._content = None
+
+    def content(self):
+        if self._content is None:
+            self._content = self.decode(self.body)
+        return self._content
+
+@dataclass
+class CacheEntry:
+    etag: Optional[str]
+    last_modified: Optional[str]
+    hash: str
+    body: bytes
+
+def cache_executor(func):
+    """Run a blocking cache method on the cache's own thread."""
+    @functools.wraps(func)
+    async def wrapper(self, *args):
+        return await asyncio.get_running_loop().run_in_executor(self.executor, functools.partial(func, self, *args))
+    return wrapper
+
+class HttpCache:
+    """On-disk cache of response bodies with their validators and content hashes.
+
+    A response is only stored after it decoded and validated, so a 304 or an
+    identical body can be reused without decoding it again. Consumers (alerts)
+    also record the hash of the last version they processed per key. When that
+    hash is unchanged the page can be skipped entirely. That record expires
+    after HTTP_CACHE_SEEN_TTL seconds, so every page is still re-diffed now and
+    then, and expired records are deleted. The file is kept under
+    HTTP_CACHE_MAX_BYTES by evicting the least recently used responses. Reads
+    only note when a response was used in memory, that is written out when
+    responses are stored, before anything is evicted.
+    """
+    def __init__(self, path: str, max_bytes: int, seen_ttl: float):
+        self.path = path
+        self.max_bytes = max_bytes
+        self.seen_ttl = seen_ttl
+        self.connection = None
+        self.total_bytes = 0
+        self.stats = defaultdict(Counter)
+        # key -> last use, not yet written to the responses table
+        self.used = {}
+        self.seen_pruned_at = 0
+        # A single thread owns the sqlite3 connection
+        self.executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="http-cache")
+
+    @cache_executor
+    def open(self) -> None:
+        self.connection = sqlite3.connect(self.path, check_same_thread=False)
+        self.connection.execute("PRAGMA journal_mode=wal")
+        self.connection.execute("""
+            CREATE TABLE IF NOT EXISTS responses (
+                key TEXT PRIMARY KEY, etag TEXT, last_modified TEXT, hash TEXT NOT NULL,
+                body BLOB NOT NULL, size INTEGER NOT NULL, used_at REAL NOT NULL
+            )""")
+        self.connection.execute("CREATE INDEX IF NOT EXISTS responses_used_at ON responses (used_at)")
+        self.connection.execute("""
+            CREATE TABLE IF NOT EXISTS seen (
+                consumer TEXT NOT NULL, key TEXT NOT NULL, hash TEXT NOT NULL, seen_at REAL NOT NULL,
+                PRIMARY KEY (consumer, key)
+            )""")
+        self.connection.execute("CREATE INDEX IF NOT EXISTS seen_seen_at ON seen (seen_at)")
+        self.prune_seen()
+        self.connection.commit()
+        self.total_bytes = self.connection.execute("SELECT COALESCE(SUM(size), 0) FROM responses").fetchone()[0]
+
+    @cache_executor
+    def close(self) -> None:
+        if self.connection is not None:
+            self.write_used()
+            self.connection.commit()
+            self.connection.close()
+            self.connection = None
+
+    @cache_executor
+    def lookup(self, key: str) -> Optional[CacheEntry]:
+        row = self.connection.execute("SELECT etag, last_modified, hash, body FROM responses WHERE key = ?", (key,)).fetchone()
+        if row is None:
+            return None
+        self.used[key] = time.time()
+        return CacheEntry(*row)
+
+    def write_used(self) -> None:
+        if self.used:
+            self.connection.executemany("UPDATE responses SET used_at = ? WHERE key = ?", [(used_at, key) for key, used_at in self.used.items()])
+            self.used.clear()
+
+    def prune_seen(self) -> None:
+        self.seen_pruned_at = time.time()
+        self.connection.execute("DELETE FROM seen WHERE seen_at < ?", (self.seen_pruned_at - self.seen_ttl,))
+
+    @cache_executor
+    def store(self, key: str, etag: Optional[str], last_modified: Optional[str], hash: str, body: bytes) -> None:
+        previous = self.connection.execute("SELECT size FROM responses WHERE key = ?", (key,)).fetchone()
+        self.connection.execute(
+            "INSERT OR REPLACE INTO responses (key, etag, last_modified, hash, body, size, used_at) VALUES (?, ?, ?, ?, ?, ?, ?)",
+            (key, etag, last_modified, hash, body, len(body), time.time()),
+        )
+        self.used.pop(key, None)
+        self.total_bytes += len(body) - (previous[0] if previous else 0)
+
+        # Eviction goes by used_at, so it has to be up to date first
+        self.write_used()
+        if time.time() - self.seen_pruned_at > self.seen_ttl:
+            self.prune_seen()
+
+        while self.total_bytes > self.max_bytes:
+            oldest = self.connection.execute("SELECT key, size FROM responses ORDER BY used_at LIMIT 1").fetchone()
+            if oldest is None:
+                break
+            self.connection.execute("DELETE FROM responses WHERE key = ?", (oldest[0],))
+            self.total_bytes -= oldest[1]
+        self.connection.commit()
+
+    @cache_executor
+    def is_seen(self, consumer: str, key: str, hash: str) -> bool:
+        row = self.connection.execute("SELECT hash, seen_at FROM seen WHERE consumer = ? AND key = ?", (consumer, key)).fetchone()
+        return row is not None and row[0] == hash and time.time() - row[1] < self.seen_ttl
+
+    @cache_executor
+    def mark_seen(self, consumer: str, key: str, hash: str) -> None:
+        self.connection.execute("INSERT OR REPLACE INTO seen (consumer, key, hash, seen_at) VALUES (?, ?, ?, ?)", (consumer, key, hash, time.time()))
+        self.connection.commit()
+
+    def forget(self, consumer: str) -> None:
+        """Drop everything a consumer has seen, in the background. Used when an alert is removed."""
+        self.executor.submit(self.delete_seen, consumer)
+
+    def delete_seen(self, consumer: str) -> None:
+        if self.connection is not None:
+            self.connection.execute("DELETE FROM seen WHERE consumer = ?", (consumer,))
+            self.connection.commit()
+
+    def count(self, source: str, event: str) -> None:
+        self.stats[source][event] += 1
+
+    def describe_stats(self) -> str:
+        return "; ".join(
+            f"{source}: hit={counts['hit']}, miss={counts['miss']}, skip={counts['skip']}"
+            for source, counts in self.stats.items()
+        )
+
+def content_hash(body: bytes) -> str:
+    return hashlib.blake2b(body, digest_size=16).hexdigest()
+
+def create_http_cache() -> HttpCache:
+    return HttpCache(
+        os.getenv("HTTP_CACHE_PATH", "http_cache.db"),
+        int(os.getenv("HTTP_CACHE_MAX_BYTES", str(100 * 1024 * 1024))),
+        float(os.getenv("HTTP_CACHE_SEEN_TTL", "3600")),
+    )
@@ -0,0 +1,24 @@
+import hikari
+from typing import Optional
+
+# Buttons on alert messages carry the item in their custom_id as
+# "item:<action>:<item id>", so a click can be resolved without fetching the message.
+PREFIX = "item"
+DELETE = "delete"
+NOTIFY = "notify"
+
+def custom_id(action: str, item_id: str) -> str:
+    return f"{PREFIX}:{action}:{item_id}"
+
+def parse_custom_id(value: str) -> Optional[tuple]:
+    """Split a custom_id into (action, item id), or None when it isn't an item button."""
+    prefix, _, rest = value.partition(":")
+    action, _, item_id = rest.partition(":")
+    if prefix != PREFIX or not action or not item_id:
+        return None
+    return action, item_id
+
+def item_buttons(rest: hikari.api.RESTClient, item_id: str) -> hikari.api.MessageActionRowBuilder:
+    return (rest.build_message_action_row()
+            .add_interactive_button(hikari.ButtonStyle.DANGER, custom_id(DELETE, item_id), emoji='🗑️', label="Remove")
+            .add_interactive_button(hikari.ButtonStyle.SECONDARY, custom_id(NOTIFY, item_id), emoji='🔔', label="Notify me"))
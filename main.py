@@ -1,100 +1,116 @@
 import os
 import dotenv
+
+# Load the environment before importing modules that read it at import time
+dotenv.load_dotenv()
+
 import lightbulb
 import hikari
 import asyncio
 import importlib
-import sys
-from models import create_tables, Alert
-from logging import info
+import repositories
+from logging import info, warning
 from yahoo import YahooAuctionsChecker
 from mercari import MercariChecker
 from surugaya import SurugayaChecker
 from processors.hikari_event import HikariEventProcessor
 from commands.base import BaseCommand
+from http_client import HttpClient
+from delivery import DeliveryQueue
+from monitoring import EventLoopLagMonitor
+from scheduler import AlertScheduler
+from workers import WorkerPool
+from storage.memory import MemoryStorage
+from storechecker import page_requests
 
 # Temporarily disabled for debugging purposes
 # if os.name != "nt":
 #     import uvloop
 #     asyncio.set_event_loop_policy(uvloop.EventLoopPolicy())
 
-dotenv.load_dotenv()
+checkers = {
+    "ENABLE_YAHOO_AUCTION": YahooAuctionsChecker,
+    "ENABLE_MERCARI": MercariChecker,
+    "ENABLE_SURUGAYA": SurugayaChecker
+}
 
-bot = lightbulb.BotApp(
-    os.environ["BOT_TOKEN"],
-    #logs="DEBUG",
-)
-
-async def create_check_tasks(alerts: list):
-    tasks = []
-    checkers = {
-        "ENABLE_YAHOO_AUCTION": YahooAuctionsChecker,
-        "ENABLE_MERCARI": MercariChecker,
-        "ENABLE_SURUGAYA": SurugayaChecker
-    }
-
-    for alert in alerts:
-        # change to != for debugging purposes
-        if alert.search_query == 'BABYMETAL BEGINS':
-            continue
-        info(f"Checking alert: {alert.search_query}")
-        for env_var, CheckerClass in checkers.items():
-            if os.getenv(env_var, "true") == "true":
-                checker = CheckerClass(bot, alert)
-                task = asyncio.create_task(bound_check(semaphore, checker.check_store))
-                tasks.append(task)
-
-    return tasks
-
-async def check_alerts(input_alerts=None) -> None:
+async def report_stats(http: HttpClient, delivery: DeliveryQueue, loop_lag_monitor: EventLoopLagMonitor) -> None:
     while True:
-        alerts = input_alerts if input_alerts else Alert.select()
-        tasks = await create_check_tasks(alerts)
-
-        if tasks:
-            try:
-                await asyncio.gather(*tasks)
-            except Exception as e:
-                info(f"Error during task execution: {e}")
-        else:
-            print("No tasks to run")
-
-        info(f"Done checking alerts. Sleeping for {os.getenv('CHECK_INTERVAL', '60')} seconds...")
-        await asyncio.sleep(int(os.getenv("CHECK_INTERVAL", "60")))
-
-semaphore = asyncio.Semaphore(4)
-async def bound_check(semaphore, func, *args):
-    async with semaphore:
-        return await func(*args)
+        await asyncio.sleep(int(os.getenv("STATS_INTERVAL", "300")))
+        info(f"HTTP pool: {http.describe_stats()}")
+        info(f"HTTP host limits: {http.describe_limits()}")
+        info(f"Shared page requests: {page_requests.describe_stats()}")
+        info(f"HTTP cache: {http.cache.describe_stats()}")
+        info(f"Discord delivery: {delivery.describe_stats()}")
+        info(f"Direct messages: {delivery.messenger.describe_stats()}")
+        info(f"Event loop lag: {loop_lag_monitor.describe_stats()}")
 
 def load_commands(bot):
     # Assuming command classes are in the 'commands' directory
     command_dir = "commands"
-    sys.path.append(command_dir)
 
     for module_name in os.listdir(command_dir):
         if module_name.endswith(".py"):
             module_name = module_name[:-3]
-            module = importlib.import_module(module_name)
+            module = importlib.import_module(f"{command_dir}.{module_name}")
             # Dynamically instantiate the command class and pass the bot
             for attr in dir(module):
                 cls = getattr(module, attr)
                 if isinstance(cls, type) and issubclass(cls, BaseCommand) and cls is not BaseCommand:
                     cls(bot)
 
-@bot.listen()
-async def on_ready(event: hikari.StartingEvent) -> None:
-    info("Starting event loop...")
-    asyncio.create_task(check_alerts())
-    
-        
-processor = HikariEventProcessor()
-@bot.listen(hikari.Event)
-async def on_event(event: hikari.Event):
-    await processor.process_event(event, bot)
+def create_bot() -> lightbulb.BotApp:
+    """Build the bot and everything that lives as long as it.
+
+    Not done at import time: worker processes are spawned, so they import this
+    module too, and they have no use for a bot of their own.
+    """
+    bot = lightbulb.BotApp(
+        os.environ["BOT_TOKEN"],
+        #logs="DEBUG",
+    )
+    http = HttpClient()
+    delivery = DeliveryQueue(bot)
+    loop_lag_monitor = EventLoopLagMonitor(float(os.getenv("LOOP_LAG_INTERVAL", "0.5")))
+    processor = HikariEventProcessor()
+
+    @bot.listen()
+    async def on_ready(event: hikari.StartingEvent) -> None:
+        info("Starting event loop...")
+        await http.start()
+        asyncio.create_task(loop_lag_monitor.run())
+        asyncio.create_task(report_stats(http, delivery, loop_lag_monitor))
+
+        worker_processes = int(os.getenv("WORKER_PROCESSES", "0"))
+        if worker_processes > 0 and isinstance(repositories.storage, MemoryStorage):
+            warning("WORKER_PROCESSES needs a SQLite DATABASE_URL, checking alerts in this process instead")
+            worker_processes = 0
+
+        if worker_processes > 0:
+            scheduler = WorkerPool(delivery, checkers, worker_processes)
+            scheduler.start()
+        else:
+            scheduler = AlertScheduler(bot, http, delivery, checkers)
+        # /register and /unregister update the scheduler directly
+        bot.d.scheduler = scheduler
+        asyncio.create_task(scheduler.run())
+
+    @bot.listen()
+    async def on_stopping(event: hikari.StoppingEvent) -> None:
+        if isinstance(bot.d.scheduler, WorkerPool):
+            await bot.d.scheduler.close()
+        await delivery.close()
+        await http.close()
+
+    @bot.listen(hikari.Event)
+    async def on_event(event: hikari.Event):
+        await processor.process_event(event, bot)
+
+    return bot
 
 if __name__ == "__main__":
-    create_tables()
+    repositories.storage.setup()
+    bot = create_bot()
     load_commands(bot)
     bot.run(
         propagate_interrupts=True,      # Any OS interrupts get rethrown as errors.
@@ -1,53 +1,36 @@
 from dataclasses import dataclass
-from logging import error
 from hikari import Color
-import math
 from storechecker import AlertChecker, AbstractItem
+from search_results import SearchResult
 
-@dataclass
+@dataclass(slots=True)
 class MercariItem(AbstractItem):
     id: str
     stock: int = 0
     price: int = 0
     title: str = ''
     image_url: str = ''
-    end_time: None
+    end_time: None = None
 
     @property
     def url(self) -> str:
         return f"https://jp.mercari.com/item/{self.id}"
 
 class MercariChecker(AlertChecker):
+    items_per_page = 99
+    page_concurrency_env = "MERCARI_PAGE_CONCURRENCY"
+
     def get_embed_color(self) -> Color:
         return Color(0xFF0000) # Red
     
-    async def fetch_items(self, session) -> list:
-        async def fetch(url):
-            async with session.get(url, headers=self.headers) as response:
-                return await response.json()
-            
-        items_per_page = 99
-        content = await fetch(f"https://www.fromjapan.co.jp/japan/sites/mercari/search?keyword={self.search_query}&sort=score&hits={items_per_page}&page=1")
-        if 'items' not in content:
-            error(f"Failed to fetch items for {self.search_query}")
-            error(content)
-        
-        if not content.get("items"):
-            return []
-
-        page_count = math.ceil(content["count"] / items_per_page)
-        if page_count > 1:
-            for page in range(2, page_count + 1):
-                page_content = await fetch(f"https://www.fromjapan.co.jp/japan/sites/mercari/search?keyword={self.search_query}&sort=score&hits={items_per_page}&page={page}")
-                content["items"].extend(page_content["items"])
-
-        return content["items"]
+    def search_url(self, page: int) -> str:
+        return f"https://www.fromjapan.co.jp/japan/sites/mercari/search?keyword={self.query}&sort={self.sort}&hits={self.items_per_page}&page={page}"
 
-    async def normalize_item(self, data: dict) -> AbstractItem:
+    async def normalize_item(self, data: SearchResult) -> AbstractItem:
         return MercariItem(
-            id=data.get('id'),
-            stock=int(data.get('stock')),
-            price=int(data.get('price')),
-            title=data.get('title', 'Unknown Title'),
-            image_url=data.get('imageUrl')
+            id=data.id,
+            stock=data.stock or 0,
+            price=data.price or 0,
+            title=data.title or 'Unknown Title',
+            image_url=data.image_url
         )
\ No newline at end of file
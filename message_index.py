@@ -0,0 +1,55 @@
+import os
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Optional
+import repositories
+
+@dataclass
+class IndexedMessage:
+    """What the reaction and button handlers need to know about an item.
+
+    It can be passed to the blacklist and notification repositories in place
+    of the stored item, so handling an indexed message needs no query.
+    """
+    # Database id of the stored item
+    id: int
+    item_id: str
+    title: Optional[str]
+    channel_id: int
+    alert_id: Optional[int]
+
+class MessageIndex:
+    """Maps the ids of alert messages the bot posted to the item they are about.
+
+    Messages are added when they are posted. On a miss the item store is asked
+    and the answer is remembered, including when there is no such item, so
+    reactions on unrelated messages don't keep hitting the database. Only the
+    MESSAGE_INDEX_SIZE most recently used messages are kept.
+    """
+    def __init__(self, max_size: int):
+        self.max_size = max_size
+        self.messages = OrderedDict()
+
+    def add(self, message_id: int, id: int, item_id: str, title: Optional[str], channel_id: int, alert_id: Optional[int]) -> None:
+        self.remember(message_id, IndexedMessage(id, item_id, title, channel_id, alert_id))
+
+    def remember(self, message_id: int, entry: Optional[IndexedMessage]) -> None:
+        self.messages[message_id] = entry
+        self.messages.move_to_end(message_id)
+        while len(self.messages) > self.max_size:
+            self.messages.popitem(last=False)
+
+    def remove(self, message_id: int) -> None:
+        self.messages.pop(message_id, None)
+
+    async def find(self, message_id: int, channel_id: int) -> Optional[IndexedMessage]:
+        if message_id in self.messages:
+            self.messages.move_to_end(message_id)
+            return self.messages[message_id]
+
+        item = await repositories.items.find_by_message_id(message_id)
+        entry = IndexedMessage(item.id, item.item_id, item.title, channel_id, item.alert_id) if item else None
+        self.remember(message_id, entry)
+        return entry
+
+message_index = MessageIndex(int(os.getenv("MESSAGE_INDEX_SIZE", "10000")))
@@ -1,10 +1,42 @@
-from peewee import Model, CharField, TextField, DeferredForeignKey, ForeignKeyField, SmallIntegerField, IntegerField, BigIntegerField, BooleanField, DateTimeField, SqliteDatabase
+from peewee import Model, CharField, TextField, DeferredForeignKey, ForeignKeyField, SmallIntegerField, IntegerField, BigIntegerField, BooleanField, DateTimeField, SqliteDatabase, fn
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
 from typing import Optional
+import asyncio
+import functools
 import os
 
-# Define the database connection
-database = SqliteDatabase(os.getenv('DATABASE_URL', 'alerts.db'))
+# Define the database connection, bound to a file by init_database()
+database = SqliteDatabase(None)
+
+def init_database(path: str) -> None:
+    # WAL lets readers run while a write is in progress, and the busy timeout
+    # makes writers wait for the lock instead of failing immediately.
+    database.init(
+        path,
+        timeout=int(os.getenv('DATABASE_BUSY_TIMEOUT', '10')),
+        pragmas={
+            'journal_mode': 'wal',
+            'synchronous': 'normal',
+            'cache_size': -16000,
+            'temp_store': 'memory',
+            'busy_timeout': int(os.getenv('DATABASE_BUSY_TIMEOUT', '10')) * 1000,
+        },
+    )
+
+# Peewee is blocking, so queries run on dedicated threads instead of the event loop
+database_executor = ThreadPoolExecutor(
+    max_workers=int(os.getenv('DATABASE_THREADS', '1')),
+    thread_name_prefix='database',
+)
+
+def db_task(func):
+    """Turn a blocking database function into a coroutine run on the database executor."""
+    @functools.wraps(func)
+    async def wrapper(*args, **kwargs):
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(database_executor, functools.partial(func, *args, **kwargs))
+    return wrapper
 
 # BaseModel to connect to the Peewee database
 class BaseModel(Model):
@@ -40,6 +72,12 @@ class Notification(BaseModel):
     item = ForeignKeyField(Item, backref='notifications')
     user_id = CharField(index=True)
 
+class ItemTitle(BaseModel):
+    """Title scraped from a product detail page, cached so it's only fetched once."""
+    item_id = CharField(unique=True)
+    title = TextField()
+    fetched_at = DateTimeField(default=datetime.now)
+
 class Filter(BaseModel):
     alert = ForeignKeyField(Alert, backref='filters')
     type = CharField()
@@ -47,7 +85,33 @@ class Filter(BaseModel):
     inverse = BooleanField(default=False)
     matches = IntegerField(default=0)
 
+class Baseline(BaseModel):
+    """Marks that a source's first scan for an alert was stored without posting."""
+    alert = ForeignKeyField(Alert, backref='baselines')
+    checker = CharField()
+    created_at = DateTimeField(default=datetime.now)
+
+    class Meta:
+        indexes = ((('alert', 'checker'), True),)
+
+class AlertThreshold(BaseModel):
+    """Per-alert overrides of when item changes are posted; unset fields use the defaults."""
+    alert = ForeignKeyField(Alert, backref='thresholds', unique=True)
+    min_stock = IntegerField(null=True)
+    price_drop = IntegerField(null=True)
+    buyout_change = IntegerField(null=True)
+
 # simple utility function to create tables
 def create_tables():
     with database:
-        database.create_tables([Alert, Item, Blacklist, Notification, Filter])
\ No newline at end of file
+        backfill_baselines = not Baseline.table_exists()
+        database.create_tables([Alert, Item, Blacklist, Notification, Filter, ItemTitle, Baseline, AlertThreshold])
+        if backfill_baselines:
+            # Once, when baselines are introduced: alerts that already stored items
+            # were scanned before, so they must not be silenced on the next run
+            query = (Item
+                     .select(Item.alert, Item.checker, fn.datetime('now', 'localtime'))
+                     .join(Alert)
+                     .where(Item.checker.is_null(False))
+                     .distinct())
+            Baseline.insert_from(query, [Baseline.alert, Baseline.checker, Baseline.created_at]).on_conflict_ignore().execute()
\ No newline at end of file
@@ -0,0 +1,34 @@
+import asyncio
+
+class EventLoopLagMonitor:
+    """Measures how late the event loop wakes up a sleeping task.
+
+    Anything that blocks the loop (a synchronous query, heavy parsing) shows up
+    directly as lag, so this is the number to watch before and after moving
+    work off the loop.
+    """
+    def __init__(self, interval: float = 0.5):
+        self.interval = interval
+        self.reset()
+
+    def reset(self) -> None:
+        self.samples = 0
+        self.total_lag = 0.0
+        self.max_lag = 0.0
+
+    async def run(self) -> None:
+        loop = asyncio.get_running_loop()
+        while True:
+            started = loop.time()
+            await asyncio.sleep(self.interval)
+            lag = max(0.0, loop.time() - started - self.interval)
+            self.samples += 1
+            self.total_lag += lag
+            self.max_lag = max(self.max_lag, lag)
+
+    def describe_stats(self) -> str:
+        """Summarize the lag since the previous call and start a new measurement window."""
+        average = self.total_lag / self.samples if self.samples else 0.0
+        summary = f"avg={average * 1000:.1f}ms, max={self.max_lag * 1000:.1f}ms, samples={self.samples}"
+        self.reset()
+        return summary
@@ -2,12 +2,15 @@ import hikari
 import hikari.events.reaction_events
 from handlers.hikari_event.reaction_add import ReactionAddHandler
 from handlers.hikari_event.reaction_delete import ReactionDeleteHandler
+from handlers.hikari_event.component_interaction import ComponentInteractionHandler
 
 class HikariEventProcessor:
     def __init__(self):
         self._handlers = {
             hikari.events.reaction_events.GuildReactionAddEvent: ReactionAddHandler(),
             hikari.events.reaction_events.GuildReactionDeleteEvent: ReactionDeleteHandler(),
+            # Buttons on alert messages; reactions remain for messages posted before them
+            hikari.InteractionCreateEvent: ComponentInteractionHandler(),
         }
 
     async def process_event(self, event: hikari.Event, bot):
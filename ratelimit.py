@@ -0,0 +1,133 @@
+import asyncio
+import os
+import time
+from logging import info
+from urllib.parse import urlsplit
+
+def parse_host_settings(value: str) -> dict:
+    """Parse ``host=value,host=value`` into a dict of floats."""
+    settings = {}
+    for entry in value.split(","):
+        if "=" in entry:
+            host, setting = entry.split("=", 1)
+            settings[host.strip()] = float(setting)
+    return settings
+
+class TokenBucket:
+    """Allows ``rate`` requests per second on average, with bursts up to ``burst``."""
+    def __init__(self, rate: float, burst: float):
+        self.rate = rate
+        self.burst = burst
+        self.tokens = burst
+        self.updated = time.monotonic()
+        self.lock = asyncio.Lock()
+
+    def refill(self) -> None:
+        now = time.monotonic()
+        self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    async def acquire(self) -> None:
+        # The lock keeps waiters in arrival order
+        async with self.lock:
+            self.refill()
+            while self.tokens < 1:
+                await asyncio.sleep((1 - self.tokens) / self.rate)
+                self.refill()
+            self.tokens -= 1
+
+    def pause(self, seconds: float) -> None:
+        """Hold back new requests for ``seconds``, e.g. when the host sent Retry-After."""
+        self.refill()
+        self.tokens = min(self.tokens, 1 - seconds * self.rate)
+
+class AdaptiveConcurrencyLimit:
+    """Concurrency limit tuned additive-increase/multiplicative-decrease style.
+
+    Each healthy response grows the limit by roughly one per round of requests.
+    A 429, a 5xx, a connection error or a response slower than the latency
+    target halves it, at most once per cooldown so a single burst of failures
+    doesn't collapse it to the minimum.
+    """
+    def __init__(self, initial: float, minimum: float, maximum: float, latency_target: float, cooldown: float = 1.0):
+        self.limit = initial
+        self.minimum = minimum
+        self.maximum = maximum
+        self.latency_target = latency_target
+        self.cooldown = cooldown
+        self.in_flight = 0
+        self.last_decrease = 0.0
+        self.condition = asyncio.Condition()
+
+    async def acquire(self) -> None:
+        async with self.condition:
+            await self.condition.wait_for(lambda: self.in_flight < int(self.limit))
+            self.in_flight += 1
+
+    async def release(self, latency: float, overloaded: bool) -> None:
+        async with self.condition:
+            self.in_flight -= 1
+            if overloaded or latency > self.latency_target:
+                now = time.monotonic()
+                if now - self.last_decrease >= self.cooldown:
+                    self.limit = max(self.minimum, self.limit / 2)
+                    self.last_decrease = now
+            else:
+                self.limit = min(self.maximum, self.limit + 1 / self.limit)
+            self.condition.notify_all()
+
+class HostLimiter:
+    """Token bucket plus adaptive concurrency limit for a single host."""
+    def __init__(self, host: str, rate: float, max_concurrency: float):
+        self.host = host
+        self.bucket = TokenBucket(rate, max(1.0, rate))
+        self.concurrency = AdaptiveConcurrencyLimit(
+            initial=min(max_concurrency, float(os.getenv("HOST_CONCURRENCY_INITIAL", "4"))),
+            minimum=1,
+            maximum=max_concurrency,
+            latency_target=float(os.getenv("HOST_LATENCY_TARGET", "5")),
+        )
+
+    async def acquire(self) -> None:
+        await self.concurrency.acquire()
+        try:
+            await self.bucket.acquire()
+        except BaseException:
+            await self.concurrency.release(0, False)
+            raise
+
+    async def release(self, latency: float, overloaded: bool, retry_after: float = 0) -> None:
+        if retry_after > 0:
+            info(f"[{self.__class__.__name__}] {self.host} asked to retry after {retry_after:.0f}s")
+            self.bucket.pause(retry_after)
+        await self.concurrency.release(latency, overloaded)
+
+class HostLimiters:
+    """Lazily creates one HostLimiter per host.
+
+    HOST_RATE_LIMIT and HOST_CONCURRENCY_MAX are the defaults, and
+    HOST_RATE_LIMITS / HOST_CONCURRENCY_LIMITS override them per host using
+    ``host=value,host=value``.
+    """
+    def __init__(self):
+        self.limiters = {}
+        self.default_rate = float(os.getenv("HOST_RATE_LIMIT", "5"))
+        self.default_concurrency = float(os.getenv("HOST_CONCURRENCY_MAX", "16"))
+        self.rates = parse_host_settings(os.getenv("HOST_RATE_LIMITS", ""))
+        self.concurrency_limits = parse_host_settings(os.getenv("HOST_CONCURRENCY_LIMITS", ""))
+
+    def for_url(self, url: str) -> HostLimiter:
+        host = urlsplit(url).hostname or ""
+        if host not in self.limiters:
+            self.limiters[host] = HostLimiter(
+                host,
+                self.rates.get(host, self.default_rate),
+                self.concurrency_limits.get(host, self.default_concurrency),
+            )
+        return self.limiters[host]
+
+    def describe(self) -> str:
+        return ", ".join(
+            f"{host}: limit={limiter.concurrency.limit:.1f}, in_flight={limiter.concurrency.in_flight}, rate={limiter.bucket.rate:g}/s"
+            for host, limiter in self.limiters.items()
+        )
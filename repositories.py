@@ -1,11 +1,26 @@
-from peewee import DoesNotExist
-from typing import Optional
-from models import Item, Blacklist
-
-class ItemRepository():
-    def find_by_id(item_id: str) -> Optional[Item]:
-        try:
-            return Item.get(Item.item_id == item_id)
-        except Item.DoesNotExist:
-            return None
-            
\ No newline at end of file
+import os
+from storage.base import Storage
+from storage.memory import MemoryStorage
+from storage.sqlite import SqliteStorage
+
+def create_storage(url: str) -> Storage:
+    """Pick a storage backend from DATABASE_URL.
+
+    ``memory://`` keeps everything in memory, anything else is treated as a
+    SQLite database path (optionally prefixed with ``sqlite:///``).
+    """
+    if url.startswith("memory://"):
+        return MemoryStorage()
+
+    return SqliteStorage(url.removeprefix("sqlite:///"))
+
+storage = create_storage(os.getenv("DATABASE_URL", "alerts.db"))
+
+alerts = storage.alerts
+items = storage.items
+blacklists = storage.blacklists
+notifications = storage.notifications
+filters = storage.filters
+titles = storage.titles
+baselines = storage.baselines
+thresholds = storage.thresholds
@@ -0,0 +1,205 @@
+import asyncio
+import heapq
+import itertools
+import os
+import time
+import zlib
+from dataclasses import dataclass, field
+from logging import info, error
+from lightbulb import BotApp
+from http_client import HttpClient
+from delivery import DeliveryQueue
+import repositories
+from circuitbreaker import CircuitOpenError, breaker_for
+from storechecker import AlertChecker, normalize_query
+from filters.engine import filter_cache
+
+def shard_for(search_query: str, source: str, shard_count: int) -> int:
+    """Pick the worker process for a job.
+
+    Jobs with the same normalized query and source land on the same worker, so
+    they can still share page requests.
+    """
+    return zlib.crc32(f"{source}|{normalize_query(search_query)}".encode()) % shard_count
+
+@dataclass(order=True)
+class ScheduledJob:
+    due: float
+    sequence: int
+    checker: AlertChecker = field(compare=False)
+    interval: float = field(compare=False)
+
+    @property
+    def alert(self):
+        return self.checker.alert
+
+    @property
+    def source(self) -> str:
+        return self.checker.__class__.__name__
+
+    @property
+    def key(self) -> tuple:
+        return (self.alert.id, self.source)
+
+class AlertScheduler:
+    """Runs every (alert, source) pair on its own adaptive interval.
+
+    Jobs wait in a heap ordered by their next due time and are handed to a pool
+    of workers as soon as they are due. A run that finds new or changed items
+    halves the job's interval, a quiet run stretches it by half, always within
+    CHECK_INTERVAL_MIN and CHECK_INTERVAL_MAX.
+
+    Every job owns one long-lived checker, so per-alert state survives between
+    runs. /register and /unregister call ``add_alert`` and ``remove_alert``
+    directly: new alerts are checked right away and removing an alert cancels
+    its running checks. ``sync_alerts`` only catches changes made outside the
+    bot, every ALERT_SYNC_INTERVAL seconds.
+
+    In a worker process ``shard`` is (worker index, worker count) and only
+    the jobs of that shard are scheduled.
+    """
+    def __init__(self, bot: BotApp, http: HttpClient, delivery: DeliveryQueue, checkers: dict, shard: tuple = (0, 1)):
+        self.bot = bot
+        self.http = http
+        self.delivery = delivery
+        self.checkers = checkers
+        self.shard = shard
+        self.heap = []
+        self.jobs = {}
+        self.running = {}
+        self.sequence = itertools.count()
+        self.queue = asyncio.Queue()
+        self.wakeup = asyncio.Event()
+
+        self.interval = int(os.getenv("CHECK_INTERVAL", "60"))
+        self.min_interval = int(os.getenv("CHECK_INTERVAL_MIN", str(max(1, self.interval // 4))))
+        self.max_interval = int(os.getenv("CHECK_INTERVAL_MAX", str(self.interval * 4)))
+        self.worker_count = int(os.getenv("CHECK_WORKERS", "4"))
+        self.sync_interval = int(os.getenv("ALERT_SYNC_INTERVAL", "60"))
+
+    def enabled_checkers(self) -> list:
+        return [CheckerClass for env_var, CheckerClass in self.checkers.items() if os.getenv(env_var, "true") == "true"]
+
+    def schedule(self, job: ScheduledJob) -> None:
+        job.sequence = next(self.sequence)
+        self.jobs[job.key] = job
+        heapq.heappush(self.heap, job)
+        self.wakeup.set()
+
+    def add_alert(self, alert) -> None:
+        """Create a checker per enabled source for the alert and run them right away."""
+        # change to != for debugging purposes
+        if alert.search_query == 'BABYMETAL BEGINS':
+            return
+
+        shard_index, shard_count = self.shard
+        for CheckerClass in self.enabled_checkers():
+            if shard_count > 1 and shard_for(alert.search_query, CheckerClass.__name__, shard_count) != shard_index:
+                continue
+
+            if (alert.id, CheckerClass.__name__) not in self.jobs:
+                info(f"[{self.__class__.__name__}] Scheduling {CheckerClass.__name__} for {alert.search_query}")
+                checker = CheckerClass(self.bot, alert, self.http, self.delivery)
+                self.schedule(ScheduledJob(time.monotonic(), 0, checker, self.interval))
+
+    def remove_alert(self, alert_id: int) -> None:
+        """Forget the alert's jobs and cancel the checks that are running for it."""
+        for key in [key for key in self.jobs if key[0] == alert_id]:
+            info(f"[{self.__class__.__name__}] Removing {key[1]} for {self.jobs[key].alert.search_query}")
+            del self.jobs[key]
+            if key in self.running:
+                self.running[key].cancel()
+        # Checkers use the alert id as their consumer name in the response cache
+        self.http.cache.forget(str(alert_id))
+
+    def invalidate_filters(self, alert_id: int) -> None:
+        """Make the alert's next check load its filters again."""
+        filter_cache.invalidate(alert_id)
+
+    async def sync_alerts(self) -> None:
+        """Add jobs for alerts created outside the bot and drop jobs whose alert is gone."""
+        alerts = await repositories.alerts.all()
+        for alert in alerts:
+            self.add_alert(alert)
+
+        alert_ids = {alert.id for alert in alerts}
+        for alert_id in {key[0] for key in self.jobs} - alert_ids:
+            self.remove_alert(alert_id)
+
+    async def run(self) -> None:
+        workers = [asyncio.create_task(self.worker()) for _ in range(self.worker_count)]
+        dispatcher = asyncio.create_task(self.dispatch())
+        try:
+            while True:
+                await self.sync_alerts()
+                info(f"[{self.__class__.__name__}] {len(self.jobs)} jobs scheduled, {self.queue.qsize()} waiting for a worker")
+                await asyncio.sleep(self.sync_interval)
+        finally:
+            dispatcher.cancel()
+            for worker in workers:
+                worker.cancel()
+
+    async def dispatch(self) -> None:
+        """Move jobs from the heap to the worker queue as they become due."""
+        while True:
+            self.wakeup.clear()
+            now = time.monotonic()
+            while self.heap and self.heap[0].due <= now:
+                job = heapq.heappop(self.heap)
+                # Skip jobs that were removed or rescheduled after being pushed
+                if self.jobs.get(job.key) is job:
+                    self.queue.put_nowait(job)
+
+            timeout = self.heap[0].due - now if self.heap else None
+            try:
+                await asyncio.wait_for(self.wakeup.wait(), timeout)
+            except asyncio.TimeoutError:
+                pass
+
+    async def worker(self) -> None:
+        while True:
+            job = await self.queue.get()
+            changes = 0
+            retry_at = None
+            breaker = breaker_for(job.source)
+            try:
+                # Skip cheaply while the source is down so the other sources get the workers
+                if breaker.is_open():
+                    retry_at = breaker.retry_at
+                elif self.jobs.get(job.key) is job:
+                    # Run in its own task so remove_alert can cancel it without stopping the worker
+                    self.running[job.key] = asyncio.create_task(job.checker.check_store())
+                    await self.running[job.key]
+                    changes = job.checker.new_counter + job.checker.updated_counter
+            except asyncio.CancelledError:
+                if asyncio.current_task().cancelling():
+                    raise
+                info(f"[{self.__class__.__name__}] Cancelled {job.source} for {job.alert.search_query}")
+            except CircuitOpenError as e:
+                retry_at = e.retry_at
+            except Exception as e:
+                error(f"[{self.__class__.__name__}] {job.source} failed for {job.alert.search_query}: {e}", exc_info=True)
+            finally:
+                self.running.pop(job.key, None)
+                self.queue.task_done()
+
+            if self.jobs.get(job.key) is not job:
+                continue
+
+            if retry_at is not None:
+                # Keep the interval, just wait for the circuit to allow a probe again
+                job.due = max(retry_at, time.monotonic() + 1)
+                self.schedule(job)
+                continue
+
+            job.interval = self.next_interval(job.interval, changes)
+            job.due = time.monotonic() + job.interval
+            info(f"[{self.__class__.__name__}] Next {job.source} check for {job.alert.search_query} in {job.interval:.0f}s")
+            self.schedule(job)
+
+    def next_interval(self, interval: float, changes: int) -> float:
+        if changes > 0:
+            interval /= 2
+        else:
+            interval *= 1.5
+        return min(self.max_interval, max(self.min_interval, interval))
@@ -0,0 +1,48 @@
+from logging import warning
+from typing import Optional, Union
+import msgspec
+
+class SearchResult(msgspec.Struct, rename="camel"):
+    """The fields of a search result the checkers use. Everything else in the result is skipped while decoding."""
+    id: Union[str, int]
+    title: Optional[str] = None
+    price: Union[int, float, None] = None
+    buy_it_now_price: Union[int, float, None] = None
+    stock: Union[int, float, None] = None
+    image_url: Optional[str] = None
+
+    def __post_init__(self):
+        # Some sources send numeric ids, the item store and the snapshot key items by text
+        self.id = str(self.id)
+        # Prices and stock are stored as whole numbers
+        for name in ("price", "buy_it_now_price", "stock"):
+            value = getattr(self, name)
+            if isinstance(value, float):
+                setattr(self, name, round(value))
+
+class SearchPage(msgspec.Struct):
+    items: list[SearchResult]
+    count: Optional[int] = None
+
+class RawSearchPage(msgspec.Struct):
+    # Results are decoded one by one, so a malformed one costs only itself
+    items: list[msgspec.Raw]
+    count: Optional[int] = None
+
+# Not strict, so numbers sent as strings are still accepted
+raw_page_decoder = msgspec.json.Decoder(RawSearchPage, strict=False)
+result_decoder = msgspec.json.Decoder(SearchResult, strict=False)
+
+def decode_search_page(body: bytes) -> SearchPage:
+    """Decode a result page, raising msgspec.ValidationError when it doesn't have a list of items.
+
+    Results that don't match SearchResult are skipped with a warning.
+    """
+    page = raw_page_decoder.decode(body)
+    items = []
+    for raw in page.items:
+        try:
+            items.append(result_decoder.decode(raw))
+        except msgspec.ValidationError as e:
+            warning(f"[SearchResult] Skipping malformed result: {e}: {bytes(raw)[:200]!r}")
+    return SearchPage(items, page.count)
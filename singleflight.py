@@ -0,0 +1,35 @@
+import asyncio
+
+class SingleFlight:
+    """Lets concurrent callers asking for the same key share one in-flight call.
+
+    The first caller starts the call; everyone who asks for the key before it
+    finishes awaits the same result (or exception). A caller being cancelled
+    doesn't cancel the shared call for the others.
+    """
+    def __init__(self):
+        self.calls = {}
+        self.started = 0
+        self.shared = 0
+
+    async def do(self, key, factory):
+        task = self.calls.get(key)
+        if task is None:
+            task = asyncio.ensure_future(factory())
+            self.calls[key] = task
+            task.add_done_callback(lambda finished: self._forget(key, finished))
+            self.started += 1
+        else:
+            self.shared += 1
+
+        return await asyncio.shield(task)
+
+    def _forget(self, key, task: asyncio.Future) -> None:
+        if self.calls.get(key) is task:
+            del self.calls[key]
+        # Retrieve the exception so an unawaited failure doesn't get logged as never retrieved
+        if not task.cancelled():
+            task.exception()
+
+    def describe_stats(self) -> str:
+        return f"started={self.started}, shared={self.shared}"
@@ -0,0 +1,129 @@
+import os
+from array import array
+from dataclasses import dataclass, field
+
+@dataclass
+class Thresholds:
+    """When a change to a known item is worth posting."""
+    # Stock changes are only posted when the new stock is at least this
+    min_stock: int = 2
+    # Price drops of this many yen or less are not posted
+    price_drop: int = 500
+    # Buyout price changes of this many yen or less are not posted
+    buyout_change: int = 500
+
+    @classmethod
+    def for_alert(cls, record) -> "Thresholds":
+        """Per-alert settings from ``record`` where set, the ALERT_* environment defaults otherwise."""
+        thresholds = cls(
+            int(os.getenv("ALERT_MIN_STOCK", "2")),
+            int(os.getenv("ALERT_PRICE_DROP", "500")),
+            int(os.getenv("ALERT_BUYOUT_CHANGE", "500")),
+        )
+        if record is not None:
+            for name in ("min_stock", "price_drop", "buyout_change"):
+                if getattr(record, name) is not None:
+                    setattr(thresholds, name, getattr(record, name))
+        return thresholds
+
+    def differences(self, stock: int, price: int, buyout_price: int, item) -> list:
+        differences = []
+        if stock != item.stock and item.stock >= self.min_stock:
+            differences.append(f"Stock changed from {stock} to {item.stock}")
+
+        if price - item.price > self.price_drop:
+            differences.append(f"Price changed from {price} to {item.price}")
+
+        if abs(buyout_price - item.buyout_price) > self.buyout_change:
+            differences.append(f"Buyout price changed from ¥{buyout_price} to ¥{item.buyout_price}")
+        return differences
+
+@dataclass
+class SnapshotDiff:
+    new: list = field(default_factory=list)
+    # (item, differences) for items with any tracked field changed; the
+    # differences only list the changes that pass the thresholds
+    changed: list = field(default_factory=list)
+    unchanged: list = field(default_factory=list)
+
+class AlertSnapshot:
+    """Last stored state of the items one checker has seen for its alert.
+
+    Prices, buyout prices and stock are kept in typed arrays indexed through an
+    id -> row map, and titles only as hashes, which keeps even large alerts
+    small. A page is diffed against it without touching the database.
+    """
+    def __init__(self):
+        self.index = {}
+        self.ids = []
+        self.prices = array('q')
+        self.buyout_prices = array('q')
+        self.stocks = array('q')
+        self.title_hashes = array('q')
+        self.seen = bytearray()
+
+    @classmethod
+    def from_rows(cls, rows: list) -> "AlertSnapshot":
+        snapshot = cls()
+        for item_id, title, stock, price, buyout_price in rows:
+            snapshot.set(item_id, title, stock or 0, price or 0, buyout_price or 0)
+        return snapshot
+
+    def __len__(self) -> int:
+        return len(self.index)
+
+    def __contains__(self, item_id: str) -> bool:
+        return item_id in self.index
+
+    def set(self, item_id: str, title: str, stock: int, price: int, buyout_price: int) -> None:
+        row = self.index.get(item_id)
+        if row is None:
+            self.index[item_id] = len(self.ids)
+            self.ids.append(item_id)
+            self.stocks.append(stock)
+            self.prices.append(price)
+            self.buyout_prices.append(buyout_price)
+            self.title_hashes.append(hash(title))
+            self.seen.append(1)
+            return
+
+        self.stocks[row] = stock
+        self.prices[row] = price
+        self.buyout_prices[row] = buyout_price
+        self.title_hashes[row] = hash(title)
+        self.seen[row] = 1
+
+    def diff(self, items: list, thresholds: Thresholds) -> SnapshotDiff:
+        result = SnapshotDiff()
+        index = self.index
+        for item in items:
+            row = index.get(item.id)
+            if row is None:
+                result.new.append(item)
+                continue
+
+            self.seen[row] = 1
+            stock, price, buyout_price = self.stocks[row], self.prices[row], self.buyout_prices[row]
+            if (stock == item.stock and price == item.price and buyout_price == item.buyout_price
+                    and self.title_hashes[row] == hash(item.title)):
+                result.unchanged.append(item)
+            else:
+                result.changed.append((item, thresholds.differences(stock, price, buyout_price, item)))
+        return result
+
+    def start_scan(self) -> None:
+        self.seen = bytearray(len(self.ids))
+
+    def remove_unseen(self) -> list:
+        """Drop the items the last complete scan didn't find and return their ids."""
+        disappeared = [item_id for item_id, seen in zip(self.ids, self.seen) if not seen]
+        if disappeared:
+            keep = [row for row, seen in enumerate(self.seen) if seen]
+            self.ids = [self.ids[row] for row in keep]
+            self.stocks = array('q', (self.stocks[row] for row in keep))
+            self.prices = array('q', (self.prices[row] for row in keep))
+            self.buyout_prices = array('q', (self.buyout_prices[row] for row in keep))
+            self.title_hashes = array('q', (self.title_hashes[row] for row in keep))
+            self.seen = bytearray(b'\x01' * len(keep))
+            self.index = {item_id: row for row, item_id in enumerate(self.ids)}
+        return disappeared
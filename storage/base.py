@@ -0,0 +1,172 @@
+from abc import ABC, abstractmethod
+from typing import Optional
+
+# Storage interface shared by every backend. Methods are coroutines so a
+# backend can either answer directly (memory) or hand the work to a thread
+# (SQLite). Returned records expose the same attribute names as the peewee
+# models: ``id``, ``item_id``, ``alert_id``, ``message_id`` and so on.
+
+class AlertRepository(ABC):
+    @abstractmethod
+    async def all(self) -> list:
+        pass
+
+    @abstractmethod
+    async def by_channel(self, channel_id: int) -> list:
+        pass
+
+    @abstractmethod
+    async def all_by_channel(self) -> list:
+        pass
+
+    @abstractmethod
+    async def search(self, text: str, limit: int = 25) -> list:
+        """Search queries containing ``text``."""
+        pass
+
+    @abstractmethod
+    async def find_by_query(self, search_query: str):
+        pass
+
+    @abstractmethod
+    async def exists(self, search_query: str) -> bool:
+        pass
+
+    @abstractmethod
+    async def create(self, channel_id: int, search_query: str):
+        pass
+
+    @abstractmethod
+    async def delete(self, alert_id: int) -> None:
+        pass
+
+    @abstractmethod
+    async def with_filter_counts(self) -> list:
+        """Alerts that have at least one filter, each with a ``filter_count`` attribute."""
+        pass
+
+class ItemRepository(ABC):
+    @abstractmethod
+    async def find_by_id(self, item_id: str):
+        pass
+
+    @abstractmethod
+    async def find_by_message_id(self, message_id: int):
+        pass
+
+    @abstractmethod
+    async def find_by_ids(self, item_ids: list, channel_id: int) -> dict:
+        """Map each stored item id to its item, with ``blacklist_id`` set when blacklisted in the channel."""
+        pass
+
+    @abstractmethod
+    async def upsert_many(self, rows: list) -> None:
+        """Insert or update items keyed on ``item_id``."""
+        pass
+
+    @abstractmethod
+    async def snapshot_rows(self, alert_id: int, checker: str) -> list:
+        """``(item_id, title, stock, price, buyout_price)`` for every item the checker stored for the alert."""
+        pass
+
+    @abstractmethod
+    async def set_message_id(self, item_id: str, message_id: int) -> Optional[int]:
+        """Point an item at the message that last alerted about it, returning the item's database id."""
+        pass
+
+class BlacklistRepository(ABC):
+    @abstractmethod
+    async def create(self, item, channel_id: int):
+        pass
+
+class NotificationRepository(ABC):
+    @abstractmethod
+    async def create(self, item, user_id: int):
+        pass
+
+    @abstractmethod
+    async def delete(self, item, user_id: int) -> bool:
+        pass
+
+    @abstractmethod
+    async def user_ids_for_item(self, item_id: str) -> list:
+        pass
+
+class FilterRepository(ABC):
+    @abstractmethod
+    async def for_alert(self, alert_id: int) -> list:
+        pass
+
+    @abstractmethod
+    async def ids(self) -> list:
+        pass
+
+    @abstractmethod
+    async def find(self, filter_id: int):
+        pass
+
+    @abstractmethod
+    async def create(self, alert_id: int, type: str, value: str, inverse: bool):
+        pass
+
+    @abstractmethod
+    async def delete(self, filter_id: int) -> None:
+        pass
+
+    @abstractmethod
+    async def increment_matches(self, counts: dict) -> None:
+        """Add the per-filter match counts gathered during a check run."""
+        pass
+
+class TitleRepository(ABC):
+    @abstractmethod
+    async def find_many(self, item_ids: list) -> dict:
+        """Map each item id with a cached title to that title."""
+        pass
+
+    @abstractmethod
+    async def save_many(self, titles: dict) -> None:
+        pass
+
+class BaselineRepository(ABC):
+    @abstractmethod
+    async def is_baselined(self, alert_id: int, checker: str) -> bool:
+        """Whether the source already completed its first scan for the alert.
+
+        Only a finished baseline counts: a first scan that stopped partway has
+        stored items but isn't baselined, so it's redone without posting.
+        """
+        pass
+
+    @abstractmethod
+    async def mark_baselined(self, alert_id: int, checker: str) -> None:
+        pass
+
+class ThresholdRepository(ABC):
+    @abstractmethod
+    async def for_alert(self, alert_id: int):
+        """The alert's threshold overrides, or None when it uses the defaults."""
+        pass
+
+    @abstractmethod
+    async def save(self, alert_id: int, min_stock: Optional[int], price_drop: Optional[int], buyout_change: Optional[int]):
+        pass
+
+    @abstractmethod
+    async def delete(self, alert_id: int) -> None:
+        pass
+
+class Storage(ABC):
+    alerts: AlertRepository
+    items: ItemRepository
+    blacklists: BlacklistRepository
+    notifications: NotificationRepository
+    filters: FilterRepository
+    titles: TitleRepository
+    baselines: BaselineRepository
+    thresholds: ThresholdRepository
+
+    @abstractmethod
+    def setup(self) -> None:
+        """Prepare the backend (create tables, open files) before the bot starts."""
+        pass
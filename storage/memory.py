@@ -0,0 +1,271 @@
+from dataclasses import dataclass, field, replace
+from datetime import datetime
+from itertools import count
+from typing import Optional
+from storage import base
+
+# Storage backend that keeps everything in dictionaries. Nothing touches the
+# disk, which makes it suitable for load tests and benchmarks that want to
+# measure scraping and Discord costs without storage costs.
+
+@dataclass
+class AlertRecord:
+    id: int
+    channel_id: int
+    search_query: str
+    filter_count: int = 0
+
+@dataclass
+class ItemRecord:
+    id: int
+    item_id: str
+    checker: Optional[str] = None
+    title: Optional[str] = None
+    stock: int = 0
+    price: int = 0
+    buyout_price: int = 0
+    message_id: Optional[int] = None
+    muted: bool = False
+    found_at: datetime = field(default_factory=datetime.now)
+    updated_at: datetime = field(default_factory=datetime.now)
+    alert_id: Optional[int] = None
+    blacklist_id: Optional[int] = None
+
+@dataclass
+class BlacklistRecord:
+    id: int
+    item_id: int
+    channel_id: int
+
+@dataclass
+class NotificationRecord:
+    id: int
+    item_id: int
+    user_id: str
+
+@dataclass
+class FilterRecord:
+    id: int
+    alert_id: int
+    type: str
+    value: str
+    inverse: bool = False
+    matches: int = 0
+
+@dataclass
+class ThresholdRecord:
+    alert_id: int
+    min_stock: Optional[int] = None
+    price_drop: Optional[int] = None
+    buyout_change: Optional[int] = None
+
+class MemoryAlertRepository(base.AlertRepository):
+    def __init__(self, storage: "MemoryStorage"):
+        self.storage = storage
+        self.records = {}
+        self.id_sequence = count(1)
+
+    async def all(self) -> list:
+        return list(self.records.values())
+
+    async def by_channel(self, channel_id: int) -> list:
+        return [alert for alert in self.records.values() if alert.channel_id == channel_id]
+
+    async def all_by_channel(self) -> list:
+        return sorted(self.records.values(), key=lambda alert: alert.channel_id)
+
+    async def search(self, text: str, limit: int = 25) -> list:
+        return [alert.search_query for alert in self.records.values() if text in alert.search_query][:limit]
+
+    async def find_by_query(self, search_query: str) -> Optional[AlertRecord]:
+        return next((alert for alert in self.records.values() if alert.search_query == search_query), None)
+
+    async def exists(self, search_query: str) -> bool:
+        return await self.find_by_query(search_query) is not None
+
+    async def create(self, channel_id: int, search_query: str) -> AlertRecord:
+        if await self.exists(search_query):
+            raise ValueError(f"Alert for {search_query} already exists")
+
+        alert = AlertRecord(id=next(self.id_sequence), channel_id=channel_id, search_query=search_query)
+        self.records[alert.id] = alert
+        return alert
+
+    async def delete(self, alert_id: int) -> None:
+        self.records.pop(alert_id, None)
+        self.storage.baselines.records = {key for key in self.storage.baselines.records if key[0] != alert_id}
+        self.storage.thresholds.records.pop(alert_id, None)
+
+    async def with_filter_counts(self) -> list:
+        alerts = []
+        for alert in self.records.values():
+            filter_count = sum(1 for filter in self.storage.filters.records.values() if filter.alert_id == alert.id)
+            if filter_count > 0:
+                alerts.append(replace(alert, filter_count=filter_count))
+        return alerts
+
+class MemoryItemRepository(base.ItemRepository):
+    def __init__(self, storage: "MemoryStorage"):
+        self.storage = storage
+        self.records = {}
+        self.id_sequence = count(1)
+
+    async def find_by_id(self, item_id: str) -> Optional[ItemRecord]:
+        return self.records.get(item_id)
+
+    async def find_by_message_id(self, message_id: int) -> Optional[ItemRecord]:
+        return next((item for item in self.records.values() if item.message_id == message_id), None)
+
+    async def find_by_ids(self, item_ids: list, channel_id: int) -> dict:
+        blacklisted = {
+            blacklist.item_id: blacklist.id
+            for blacklist in self.storage.blacklists.records
+            if blacklist.channel_id == channel_id
+        }
+
+        stored_items = {}
+        for item_id in item_ids:
+            item = self.records.get(item_id)
+            if item is not None:
+                stored_items[item_id] = replace(item, blacklist_id=blacklisted.get(item.id))
+        return stored_items
+
+    async def upsert_many(self, rows: list) -> None:
+        for row in rows:
+            values = dict(row)
+            if "alert" in values:
+                values["alert_id"] = values.pop("alert")
+
+            item = self.records.get(values["item_id"])
+            if item is None:
+                self.records[values["item_id"]] = ItemRecord(id=next(self.id_sequence), **values)
+                continue
+
+            values.pop("found_at", None)
+            for key, value in values.items():
+                setattr(item, key, value)
+
+    async def snapshot_rows(self, alert_id: int, checker: str) -> list:
+        return [
+            (item.item_id, item.title, item.stock, item.price, item.buyout_price)
+            for item in self.records.values()
+            if item.alert_id == alert_id and item.checker == checker
+        ]
+
+    async def set_message_id(self, item_id: str, message_id: int) -> Optional[int]:
+        item = self.records.get(item_id)
+        if item is None:
+            return None
+
+        item.message_id = message_id
+        return item.id
+
+class MemoryBlacklistRepository(base.BlacklistRepository):
+    def __init__(self):
+        self.records = []
+        self.id_sequence = count(1)
+
+    async def create(self, item, channel_id: int) -> BlacklistRecord:
+        blacklist = BlacklistRecord(id=next(self.id_sequence), item_id=item.id, channel_id=channel_id)
+        self.records.append(blacklist)
+        return blacklist
+
+class MemoryNotificationRepository(base.NotificationRepository):
+    def __init__(self, storage: "MemoryStorage"):
+        self.storage = storage
+        self.records = []
+        self.id_sequence = count(1)
+
+    async def create(self, item, user_id: int) -> NotificationRecord:
+        notification = NotificationRecord(id=next(self.id_sequence), item_id=item.id, user_id=str(user_id))
+        self.records.append(notification)
+        return notification
+
+    async def delete(self, item, user_id: int) -> bool:
+        remaining = [
+            notification for notification in self.records
+            if not (notification.item_id == item.id and notification.user_id == str(user_id))
+        ]
+        deleted = len(remaining) != len(self.records)
+        self.records = remaining
+        return deleted
+
+    async def user_ids_for_item(self, item_id: str) -> list:
+        item = self.storage.items.records.get(item_id)
+        if item is None:
+            return []
+        return [notification.user_id for notification in self.records if notification.item_id == item.id]
+
+class MemoryFilterRepository(base.FilterRepository):
+    def __init__(self):
+        self.records = {}
+        self.id_sequence = count(1)
+
+    async def for_alert(self, alert_id: int) -> list:
+        return [filter for filter in self.records.values() if filter.alert_id == alert_id]
+
+    async def ids(self) -> list:
+        return list(self.records)
+
+    async def find(self, filter_id: int) -> Optional[FilterRecord]:
+        return self.records.get(filter_id)
+
+    async def create(self, alert_id: int, type: str, value: str, inverse: bool) -> FilterRecord:
+        filter = FilterRecord(id=next(self.id_sequence), alert_id=alert_id, type=type, value=value, inverse=inverse)
+        self.records[filter.id] = filter
+        return filter
+
+    async def delete(self, filter_id: int) -> None:
+        self.records.pop(filter_id, None)
+
+    async def increment_matches(self, counts: dict) -> None:
+        for filter_id, matches in counts.items():
+            if filter_id in self.records:
+                self.records[filter_id].matches += matches
+
+class MemoryTitleRepository(base.TitleRepository):
+    def __init__(self):
+        self.records = {}
+
+    async def find_many(self, item_ids: list) -> dict:
+        return {item_id: self.records[item_id] for item_id in item_ids if item_id in self.records}
+
+    async def save_many(self, titles: dict) -> None:
+        self.records.update(titles)
+
+class MemoryBaselineRepository(base.BaselineRepository):
+    def __init__(self):
+        self.records = set()
+
+    async def is_baselined(self, alert_id: int, checker: str) -> bool:
+        return (alert_id, checker) in self.records
+
+    async def mark_baselined(self, alert_id: int, checker: str) -> None:
+        self.records.add((alert_id, checker))
+
+class MemoryThresholdRepository(base.ThresholdRepository):
+    def __init__(self):
+        self.records = {}
+
+    async def for_alert(self, alert_id: int) -> Optional[ThresholdRecord]:
+        return self.records.get(alert_id)
+
+    async def save(self, alert_id: int, min_stock: Optional[int], price_drop: Optional[int], buyout_change: Optional[int]) -> None:
+        self.records[alert_id] = ThresholdRecord(alert_id, min_stock, price_drop, buyout_change)
+
+    async def delete(self, alert_id: int) -> None:
+        self.records.pop(alert_id, None)
+
+class MemoryStorage(base.Storage):
+    def __init__(self):
+        self.alerts = MemoryAlertRepository(self)
+        self.items = MemoryItemRepository(self)
+        self.blacklists = MemoryBlacklistRepository()
+        self.notifications = MemoryNotificationRepository(self)
+        self.filters = MemoryFilterRepository()
+        self.titles = MemoryTitleRepository()
+        self.baselines = MemoryBaselineRepository()
+        self.thresholds = MemoryThresholdRepository()
+
+    def setup(self) -> None:
+        pass
@@ -0,0 +1,221 @@
+from peewee import JOIN, chunked, fn
+from typing import Optional
+from models import database, db_task, init_database, create_tables, Alert, Item, Blacklist, Notification, Filter, ItemTitle, Baseline, AlertThreshold
+from storage import base
+
+# Every repository method runs on the database executor and must be awaited.
+# Results are materialized before they are handed back to the event loop.
+
+class SqliteAlertRepository(base.AlertRepository):
+    @db_task
+    def all(self) -> list:
+        return list(Alert.select())
+
+    @db_task
+    def by_channel(self, channel_id: int) -> list:
+        return list(Alert.select().where(Alert.channel_id == channel_id))
+
+    @db_task
+    def all_by_channel(self) -> list:
+        return list(Alert.select().order_by(Alert.channel_id))
+
+    @db_task
+    def search(self, text: str, limit: int = 25) -> list:
+        return [alert.search_query for alert in Alert.select(Alert.search_query).where(Alert.search_query.contains(text)).limit(limit)]
+
+    @db_task
+    def find_by_query(self, search_query: str) -> Optional[Alert]:
+        return Alert.select().where(Alert.search_query == search_query).get_or_none()
+
+    @db_task
+    def exists(self, search_query: str) -> bool:
+        return Alert.select().where(Alert.search_query == search_query).exists()
+
+    @db_task
+    def create(self, channel_id: int, search_query: str) -> Alert:
+        return Alert.create(channel_id=channel_id, search_query=search_query)
+
+    @db_task
+    def delete(self, alert_id: int) -> None:
+        Baseline.delete().where(Baseline.alert == alert_id).execute()
+        AlertThreshold.delete().where(AlertThreshold.alert == alert_id).execute()
+        Alert.delete().where(Alert.id == alert_id).execute()
+
+    @db_task
+    def with_filter_counts(self) -> list:
+        """Alerts that have at least one filter, each with a ``filter_count`` attribute."""
+        return list(Alert
+                    .select(Alert, fn.Count(Filter.id).alias('filter_count'))
+                    .join(Filter, JOIN.LEFT_OUTER)
+                    .group_by(Alert)
+                    .having(fn.Count(Filter.id) > 0))
+
+class SqliteItemRepository(base.ItemRepository):
+    @db_task
+    def find_by_id(self, item_id: str) -> Optional[Item]:
+        try:
+            return Item.get(Item.item_id == item_id)
+        except Item.DoesNotExist:
+            return None
+
+    @db_task
+    def find_by_message_id(self, message_id: int) -> Optional[Item]:
+        return Item.select().where(Item.message_id == message_id).get_or_none()
+
+    @db_task
+    def find_by_ids(self, item_ids: list, channel_id: int) -> dict:
+        """Resolve a page of item ids in a single query.
+
+        Each returned Item carries a ``blacklist_id`` attribute, which is set when
+        the item is blacklisted in the given channel.
+        """
+        if not item_ids:
+            return {}
+
+        query = (Item
+                 .select(Item, Blacklist.id.alias('blacklist_id'))
+                 .join(Blacklist, JOIN.LEFT_OUTER, on=((Blacklist.item == Item.id) & (Blacklist.channel_id == channel_id)))
+                 .where(Item.item_id.in_(item_ids))
+                 .objects())
+
+        return {item.item_id: item for item in query}
+
+    @db_task
+    def upsert_many(self, rows: list) -> None:
+        """Insert or update items keyed on item_id, all in one transaction."""
+        if not rows:
+            return
+
+        with database.atomic():
+            for batch in chunked(rows, 100):
+                (Item
+                 .insert_many(batch)
+                 .on_conflict(
+                     conflict_target=[Item.item_id],
+                     preserve=[Item.checker, Item.title, Item.stock, Item.price, Item.buyout_price, Item.updated_at, Item.alert],
+                 )
+                 .execute())
+
+    @db_task
+    def snapshot_rows(self, alert_id: int, checker: str) -> list:
+        return list(Item
+                    .select(Item.item_id, Item.title, Item.stock, Item.price, Item.buyout_price)
+                    .where(Item.alert == alert_id, Item.checker == checker)
+                    .tuples())
+
+    @db_task
+    def set_message_id(self, item_id: str, message_id: int) -> Optional[int]:
+        item = Item.select(Item.id).where(Item.item_id == item_id).get_or_none()
+        if item is None:
+            return None
+
+        Item.update(message_id=message_id).where(Item.id == item.id).execute()
+        return item.id
+
+class SqliteBlacklistRepository(base.BlacklistRepository):
+    @db_task
+    def create(self, item: Item, channel_id: int) -> Blacklist:
+        return Blacklist.create(item=item.id, channel_id=channel_id)
+
+class SqliteNotificationRepository(base.NotificationRepository):
+    @db_task
+    def create(self, item: Item, user_id: int) -> Notification:
+        return Notification.create(item=item.id, user_id=user_id)
+
+    @db_task
+    def delete(self, item: Item, user_id: int) -> bool:
+        return Notification.delete().where(Notification.item == item.id, Notification.user_id == user_id).execute() > 0
+
+    @db_task
+    def user_ids_for_item(self, item_id: str) -> list:
+        db_item = Item.select(Item.id).where(Item.item_id == item_id)
+        return [notification.user_id for notification in Notification.select(Notification.user_id).where(Notification.item.in_(db_item))]
+
+class SqliteFilterRepository(base.FilterRepository):
+    @db_task
+    def for_alert(self, alert_id: int) -> list:
+        return list(Filter.select().where(Filter.alert == alert_id))
+
+    @db_task
+    def ids(self) -> list:
+        return [filter.id for filter in Filter.select(Filter.id)]
+
+    @db_task
+    def find(self, filter_id: int) -> Optional[Filter]:
+        return Filter.select().where(Filter.id == filter_id).get_or_none()
+
+    @db_task
+    def create(self, alert_id: int, type: str, value: str, inverse: bool) -> Filter:
+        return Filter.create(alert=alert_id, type=type, value=value, inverse=inverse)
+
+    @db_task
+    def delete(self, filter_id: int) -> None:
+        Filter.delete().where(Filter.id == filter_id).execute()
+
+    @db_task
+    def increment_matches(self, counts: dict) -> None:
+        if not counts:
+            return
+
+        with database.atomic():
+            for filter_id, matches in counts.items():
+                Filter.update(matches=Filter.matches + matches).where(Filter.id == filter_id).execute()
+
+class SqliteTitleRepository(base.TitleRepository):
+    @db_task
+    def find_many(self, item_ids: list) -> dict:
+        if not item_ids:
+            return {}
+
+        return {row.item_id: row.title for row in ItemTitle.select(ItemTitle.item_id, ItemTitle.title).where(ItemTitle.item_id.in_(item_ids))}
+
+    @db_task
+    def save_many(self, titles: dict) -> None:
+        if not titles:
+            return
+
+        rows = [{"item_id": item_id, "title": title} for item_id, title in titles.items()]
+        with database.atomic():
+            for batch in chunked(rows, 100):
+                ItemTitle.insert_many(batch).on_conflict(conflict_target=[ItemTitle.item_id], preserve=[ItemTitle.title]).execute()
+
+class SqliteBaselineRepository(base.BaselineRepository):
+    @db_task
+    def is_baselined(self, alert_id: int, checker: str) -> bool:
+        return Baseline.select().where(Baseline.alert == alert_id, Baseline.checker == checker).exists()
+
+    @db_task
+    def mark_baselined(self, alert_id: int, checker: str) -> None:
+        Baseline.insert(alert=alert_id, checker=checker).on_conflict_ignore().execute()
+
+class SqliteThresholdRepository(base.ThresholdRepository):
+    @db_task
+    def for_alert(self, alert_id: int) -> Optional[AlertThreshold]:
+        return AlertThreshold.select().where(AlertThreshold.alert == alert_id).get_or_none()
+
+    @db_task
+    def save(self, alert_id: int, min_stock: Optional[int], price_drop: Optional[int], buyout_change: Optional[int]) -> None:
+        (AlertThreshold
+         .insert(alert=alert_id, min_stock=min_stock, price_drop=price_drop, buyout_change=buyout_change)
+         .on_conflict(conflict_target=[AlertThreshold.alert], preserve=[AlertThreshold.min_stock, AlertThreshold.price_drop, AlertThreshold.buyout_change])
+         .execute())
+
+    @db_task
+    def delete(self, alert_id: int) -> None:
+        AlertThreshold.delete().where(AlertThreshold.alert == alert_id).execute()
+
+class SqliteStorage(base.Storage):
+    def __init__(self, path: str):
+        self.path = path
+        self.alerts = SqliteAlertRepository()
+        self.items = SqliteItemRepository()
+        self.blacklists = SqliteBlacklistRepository()
+        self.notifications = SqliteNotificationRepository()
+        self.filters = SqliteFilterRepository()
+        self.titles = SqliteTitleRepository()
+        self.baselines = SqliteBaselineRepository()
+        self.thresholds = SqliteThresholdRepository()
+
+    def setup(self) -> None:
+        init_database(self.path)
+        create_tables()
@@ -1,15 +1,39 @@
 from abc import ABC, abstractmethod
+import asyncio
+import math
+import os
+import re
+import time
+import unicodedata
+from collections import Counter, deque
+from contextlib import aclosing
 from dataclasses import dataclass
 from datetime import datetime
-from models import Alert, Item, Notification
-from typing import Optional
-from repositories import ItemRepository
-import aiohttp
-from logging import info, warning
+from models import Alert
+from typing import AsyncIterator, Optional
+from urllib.parse import quote_plus
+import repositories
+from filters.engine import filter_cache
+from circuitbreaker import CircuitOpenError, breaker_for, retry_budget_for, retry_delay
+from singleflight import SingleFlight
+from httpcache import CachedPage
+from delivery import DeliveryQueue, OutboundPost, NEW_ITEM, ITEM_UPDATE
+from snapshot import AlertSnapshot, Thresholds
+from search_results import SearchResult, decode_search_page
+from http_client import HttpClient
+from logging import info, warning, error
 from lightbulb import BotApp
 from hikari import Embed, Color
 
-@dataclass
+# Result pages currently being fetched, shared between alerts with the same query
+page_requests = SingleFlight()
+
+def normalize_query(search_query: str) -> str:
+    """Fold full-width characters, case and whitespace so equivalent queries compare equal."""
+    return re.sub(r"\s+", " ", unicodedata.normalize("NFKC", search_query)).strip().casefold()
+
+# Slotted: a large check holds tens of thousands of items at once
+@dataclass(slots=True)
 class AbstractItem(ABC):
     id: str
     stock: int = 1
@@ -17,11 +41,9 @@ class AbstractItem(ABC):
     buyout_price: int = 0
     title: str = ''
     image_url: str = ''
-    message_id: int = 0
     end_time: datetime = None
-    muted: bool = False
 
-@dataclass
+@dataclass(slots=True)
 class StoredItem(AbstractItem):
     id: str
     stock: int = 0
@@ -36,135 +58,405 @@ class StoredItem(AbstractItem):
     blacklisted: bool = False
         
 class AlertChecker(ABC):
-    def __init__(self, bot: BotApp, alert: Alert):
+    items_per_page = 99
+    # Environment variable capping concurrent page requests for this source
+    page_concurrency_env = "PAGE_CONCURRENCY"
+    # Sort order used by incremental scans, newest listings first
+    incremental_sort = "new"
+    _page_semaphores = {}
+
+    def __init__(self, bot: BotApp, alert: Alert, http: HttpClient, delivery: DeliveryQueue):
         self.bot = bot
+        self.http = http
+        self.delivery = delivery
         self.alert = alert
         self.search_query = alert.search_query
+        self.normalized_query = normalize_query(alert.search_query)
+        # URL-encoded normalized query for use in search_url
+        self.query = quote_plus(self.normalized_query)
         self.channel_id = alert.channel_id
-        self.item_repo = ItemRepository()
-        self.up_to_date_counter = 0
+        self.item_repo = repositories.items
+        # Checkers live as long as their alert, this state carries over between runs
+        self.last_full_scan = None
+        # Loaded from the item store on the first run, then kept up to date in memory
+        self.snapshot = None
+        self.thresholds = Thresholds()
         self.headers = {
             'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/119.0.0.0 Safari/537.36',
         }
+        self.reset_run()
+
+    def reset_run(self) -> None:
+        """Clear the per-run counters before a check."""
+        self.up_to_date_counter = 0
+        self.new_counter = 0
+        self.updated_counter = 0
+        self.filtered_counter = 0
+        self.filter_matches = Counter()
+        self.known_run = 0
+        # Posts for the current page, handed to the delivery queue once the page is stored
+        self.outbox = []
+        # The first scan of an alert stores what it finds without posting
+        self.baseline = False
+        self.baseline_counter = 0
+        self.incremental = False
+        self.sort = "score"
+        # Pages that couldn't be fetched, which make the scan incomplete
+        self.failed_pages = 0
 
     @abstractmethod
     def get_embed_color(self) -> Color:
         pass
 
     @abstractmethod
-    async def fetch_items(self) -> list:
+    def search_url(self, page: int) -> str:
         pass
-    
+
+    def use_incremental_scan(self) -> bool:
+        """Whether this run may stop at known items, or must do a periodic full rescan."""
+        if os.getenv("SCAN_MODE", "full") != "incremental":
+            return False
+
+        if self.last_full_scan is None:
+            return False
+
+        return time.monotonic() - self.last_full_scan < int(os.getenv("FULL_RESCAN_INTERVAL", "21600"))
+
+    def page_concurrency(self) -> int:
+        return int(os.getenv(self.page_concurrency_env, os.getenv("PAGE_CONCURRENCY", "4")))
+
+    def page_semaphore(self) -> asyncio.Semaphore:
+        """Semaphore shared by every checker of this source, capping concurrent page requests."""
+        source = self.__class__.__name__
+        if source not in AlertChecker._page_semaphores:
+            AlertChecker._page_semaphores[source] = asyncio.Semaphore(self.page_concurrency())
+        return AlertChecker._page_semaphores[source]
+
+    def page_key(self, page: int) -> str:
+        return f"{self.__class__.__name__}|{self.normalized_query}|{self.sort}|{page}"
+
+    async def fetch_page(self, page: int) -> Optional[CachedPage]:
+        """Fetch one result page, sharing the request with any alert fetching the same page right now.
+
+        The returned page may be handed to several checkers and its content must not be modified.
+        """
+        key = self.page_key(page)
+        return await page_requests.do(key, lambda: self.request_page(page, key))
+
+    async def request_page(self, page: int, key: str) -> Optional[CachedPage]:
+        """Request one result page, retrying with jittered backoff while the source's retry budget allows.
+
+        Returns None when the page could not be fetched, and raises CircuitOpenError
+        when the source's circuit breaker refuses the request.
+        """
+        source = self.__class__.__name__
+        breaker = breaker_for(source)
+        retry_budget = retry_budget_for(source)
+        attempts = 1 + int(os.getenv("FETCH_RETRIES", "2"))
+
+        for attempt in range(attempts):
+            if not breaker.allow_request():
+                raise CircuitOpenError(source, breaker.retry_at)
+
+            retry_budget.record_request()
+            try:
+                async with self.page_semaphore():
+                    cached_page = await self.http.get_cached(source, key, self.search_url(page), self.headers, decode_search_page)
+                breaker.record_success()
+                return cached_page
+            except Exception as e:
+                error(f"[{source}] Failed to fetch page {page} for {self.search_query}: {e}")
+
+            breaker.record_failure()
+            if attempt + 1 == attempts or not retry_budget.try_spend():
+                return None
+            await asyncio.sleep(retry_delay(attempt))
+
+    async def fetch_pages(self) -> AsyncIterator[CachedPage]:
+        """Yield each result page, in page order, as soon as it arrives.
+
+        Page 1 is fetched and decoded first to learn the page count. Later pages are
+        prefetched in a sliding window of page_concurrency() requests, so memory
+        stays bounded by a handful of pages while the caller processes the current one.
+        """
+        content = await self.fetch_page(1)
+        if not content:
+            self.failed_pages += 1
+            return
+        if not content.content().items:
+            return
+
+        page_count = math.ceil((content.content().count or 0) / self.items_per_page)
+        next_page = 2
+        pending = deque()
+        try:
+            while True:
+                while next_page <= page_count and len(pending) < self.page_concurrency():
+                    pending.append(asyncio.create_task(self.fetch_page(next_page)))
+                    next_page += 1
+
+                if content:
+                    yield content
+                else:
+                    self.failed_pages += 1
+
+                if not pending:
+                    break
+                content = await pending.popleft()
+        finally:
+            for task in pending:
+                task.cancel()
+
     @abstractmethod
-    async def normalize_item(self, data: dict) -> AbstractItem:
+    async def normalize_item(self, data: SearchResult) -> AbstractItem:
         """Factory method to create a new item instance from data."""
         pass
 
-    async def find_stored_item(self, id: str) -> Optional[AbstractItem]:
-        item = Item.select().where(Item.item_id == id).get_or_none()
+    async def enrich_items(self, items: list) -> None:
+        """Hook to complete a page of normalized items with data the search API doesn't return."""
+        pass
 
-        if item == None:
-            return None
-        
-        return StoredItem(
-            id=item.item_id,
-            stock=item.stock,
-            price=item.price,
-            buyout_price=item.buyout_price,
-            muted=item.muted,
-            blacklisted=item.blacklisted(self.channel_id),
-        )
+    async def find_stored_items(self, ids: list) -> dict:
+        """Look up a page of items and their blacklist state for this channel in one query."""
+        stored_items = {}
+        if not ids:
+            return stored_items
+
+        for item in (await self.item_repo.find_by_ids(ids, self.channel_id)).values():
+            stored_items[item.item_id] = StoredItem(
+                id=item.item_id,
+                stock=item.stock,
+                price=item.price,
+                buyout_price=item.buyout_price,
+                title=item.title,
+                message_id=item.message_id,
+                muted=item.muted,
+                blacklisted=item.blacklist_id is not None,
+            )
+
+        return stored_items
     
     async def check_store(self) -> None:
-        async with aiohttp.ClientSession() as session:
-            info(f"[{self.__class__.__name__}] Searching for {self.search_query}...")
-            results = await self.fetch_items(session)
-            if not results:
-                warning(f"[{self.__class__.__name__}] no search results found [{self.search_query}]")
-                return
-    
-            for result in results:
-                found_item = await self.normalize_item(result)
-                stored_item = await self.find_stored_item(found_item.id)
-                
+        self.reset_run()
+        self.thresholds = Thresholds.for_alert(await repositories.thresholds.for_alert(self.alert.id))
+        if self.snapshot is None:
+            self.snapshot = AlertSnapshot.from_rows(await self.item_repo.snapshot_rows(self.alert.id, self.__class__.__name__))
+        self.snapshot.start_scan()
+        self.baseline = not await repositories.baselines.is_baselined(self.alert.id, self.__class__.__name__)
+        self.incremental = not self.baseline and self.use_incremental_scan()
+        self.sort = self.incremental_sort if self.incremental else "score"
+        scan = 'baseline' if self.baseline else 'incremental' if self.incremental else 'full'
+        info(f"[{self.__class__.__name__}] Searching for {self.search_query} ({scan} scan)...")
+
+        result_count = 0
+        skipped_pages = 0
+        consumer = str(self.alert.id)
+        async with aclosing(self.fetch_pages()) as pages:
+            async for page in pages:
+                # This alert already processed exactly this content, nothing can have changed
+                if await self.http.cache.is_seen(consumer, page.key, page.hash):
+                    self.http.cache.count(self.__class__.__name__, "skip")
+                    skipped_pages += 1
+                    if self.incremental:
+                        info(f"[{self.__class__.__name__}] Reached an unchanged page, stopping [{self.search_query}]")
+                        break
+                    continue
+
+                items = page.content().items
+                result_count += len(items)
+                known_count = await self.check_page(items)
+                await self.http.cache.mark_seen(consumer, page.key, page.hash)
+
+                if self.incremental and self.reached_known_items(len(items), known_count):
+                    info(f"[{self.__class__.__name__}] Reached known items after {result_count} results, stopping [{self.search_query}]")
+                    break
+
+        if self.failed_pages > 0:
+            warning(f"[{self.__class__.__name__}] {self.failed_pages} pages couldn't be fetched, the scan is incomplete [{self.search_query}]")
+
+        if skipped_pages > 0:
+            info(f"[{self.__class__.__name__}] {skipped_pages} unchanged pages skipped [{self.search_query}]")
+        elif not self.incremental and result_count and not self.failed_pages:
+            # Only a scan that looked at every page can tell what disappeared
+            disappeared = self.snapshot.remove_unseen()
+            if disappeared:
+                info(f"[{self.__class__.__name__}] {len(disappeared)} items disappeared [{self.search_query}]")
+
+        await repositories.filters.increment_matches(self.filter_matches)
+        self.filter_matches.clear()
+
+        if not self.incremental and not self.failed_pages:
+            self.last_full_scan = time.monotonic()
+
+        if self.baseline and not self.failed_pages:
+            # Items on the missing pages would be posted as new otherwise. An empty
+            # scan does finish it, so the first listing to show up is posted.
+            await self.finish_baseline()
+
+        if not result_count and not skipped_pages:
+            if self.failed_pages:
+                # The baseline, if any, is retried next time
+                warning(f"[{self.__class__.__name__}] no search results found, the request failed [{self.search_query}]")
+            else:
+                info(f"[{self.__class__.__name__}] no search results found [{self.search_query}]")
+            return
+
+        if self.up_to_date_counter > 0:
+            info(f"[{self.__class__.__name__}] {self.up_to_date_counter} items up to date [{self.search_query}]")
+
+        if self.filtered_counter > 0:
+            info(f"[{self.__class__.__name__}] {self.filtered_counter} items rejected by filters [{self.search_query}]")
+
+    async def finish_baseline(self) -> None:
+        await repositories.baselines.mark_baselined(self.alert.id, self.__class__.__name__)
+        info(f"[{self.__class__.__name__}] Baseline of {self.baseline_counter} items stored without posting [{self.search_query}]")
+
+        if os.getenv("BASELINE_SUMMARY", "false") == "true":
+            await self.delivery.enqueue_notice(
+                self.channel_id,
+                f"Tracking {self.baseline_counter} existing {self.__class__.__name__.removesuffix('Checker')} listings for **{self.search_query}**. "
+                "Only listings that appear from now on will be posted.",
+            )
+
+    def reached_known_items(self, page_size: int, known_count: int) -> bool:
+        stop_after = int(os.getenv("INCREMENTAL_STOP_AFTER", "50"))
+        return known_count == page_size or (stop_after > 0 and self.known_run >= stop_after)
+
+    async def check_page(self, page: list) -> int:
+        """Diff a page of results against the alert's snapshot, returning how many were already known.
+
+        Unchanged items cost no database work. Stored records are only looked up,
+        in one query, for items that may be posted. All inserts and updates for
+        the page are written in one batched upsert.
+        """
+        known_count = 0
+        rows = []
+        found_items = []
+        settled = []
+        normalized_items = [await self.normalize_item(result) for result in page]
+        await self.enrich_items(normalized_items)
+
+        alert_filters = await filter_cache.get(self.alert.id)
+        for found_item in normalized_items:
+            accepted, filter_id = alert_filters.check(found_item.title)
+            if filter_id is not None:
+                self.filter_matches[filter_id] += 1
+
+            if accepted:
+                found_items.append(found_item)
+            else:
+                # Rejected items will never alert, so they count as known for incremental scans
+                self.filtered_counter += 1
+                known_count += 1
+                self.known_run += 1
+
+        diff = self.snapshot.diff(found_items, self.thresholds)
+        self.up_to_date_counter += len(diff.unchanged)
+
+        # Only items that may be posted need their stored record, for the blacklist and mute state
+        candidates = diff.new + [item for item, differences in diff.changed if differences]
+        stored_items = await self.find_stored_items([item.id for item in candidates])
+
+        for found_item in found_items:
+            if found_item.id in self.snapshot or found_item.id in stored_items:
+                known_count += 1
+                self.known_run += 1
+            else:
+                self.known_run = 0
+
+        for found_item, differences in diff.changed:
+            self.up_to_date_counter += 1
+            if differences:
+                stored_item = stored_items.get(found_item.id)
                 if stored_item and stored_item.blacklisted:
                     info(f"[{self.__class__.__name__}] Item blacklisted: {found_item.title}")
+                    settled.append(found_item)
                     continue
 
-                if stored_item:
-                    await self.check_item(stored_item, found_item)
-                else:
-                    await self.new_item(found_item)
+                self.updated_counter += 1
+                self.update_item(found_item, differences, stored_item.muted if stored_item else False)
+            rows.append(self.item_row(found_item))
+            settled.append(found_item)
 
-            if self.up_to_date_counter > 0:
-                info(f"[{self.__class__.__name__}] {self.up_to_date_counter} items up to date [{self.search_query}]")
+        for found_item in diff.new:
+            stored_item = stored_items.get(found_item.id)
+            if stored_item and stored_item.blacklisted:
+                info(f"[{self.__class__.__name__}] Item blacklisted: {found_item.title}")
+                settled.append(found_item)
+                continue
 
-    async def check_item(self, stored_item: AbstractItem, found_item: AbstractItem) -> None:
-        differences = []
+            if stored_item:
+                # Stored by another alert, or before this snapshot was loaded
+                row = await self.check_item(stored_item, found_item)
+            else:
+                row = await self.new_item(found_item)
 
-        # Only alert and update  if the stock difference is greater than 1
-        if stored_item.stock != found_item.stock and found_item.stock > 1:
-            differences.append(f"Stock changed from {stored_item.stock} to {found_item.stock}")
+            if row:
+                rows.append(row)
+            settled.append(found_item)
 
-        # Only alert and update if the price decrease is greater than 500 yen
-        if int(stored_item.price)-int(found_item.price) > 500:
-            differences.append(f"Price changed from {stored_item.price} to {found_item.price}")
+        await self.item_repo.upsert_many(rows)
+        # Only once stored, so a failed write is diffed again next time
+        for item in settled:
+            self.snapshot.set(item.id, item.title, item.stock, item.price, item.buyout_price)
 
-        # Only alert and update if the buyout price difference is greater than 500 yen
-        if abs(int(stored_item.buyout_price)-int(found_item.buyout_price)) > 500:
-            differences.append(f"Buyout price changed from ¥{stored_item.buyout_price} to ¥{found_item.buyout_price}")
+        # Enqueue only after the items exist, so the delivered message id can be stored on them
+        for post in self.outbox:
+            await self.delivery.enqueue(post)
+        self.outbox.clear()
+
+        return known_count
+
+    def item_row(self, item: AbstractItem) -> dict:
+        # message_id is left out, it is set by the delivery queue once the alert is posted
+        return {
+            "item_id": item.id,
+            "checker": self.__class__.__name__,
+            "title": item.title,
+            "stock": item.stock,
+            "price": item.price,
+            "buyout_price": item.buyout_price,
+            "found_at": datetime.now(),
+            "updated_at": datetime.now(),
+            "alert": self.alert.id,
+        }
+
+    async def check_item(self, stored_item: StoredItem, found_item: AbstractItem) -> Optional[dict]:
+        """Return the row to upsert for a known item, or None when nothing we track has changed."""
+        differences = self.thresholds.differences(stored_item.stock, stored_item.price, stored_item.buyout_price, found_item)
 
         if differences:
-            await self.update_item(found_item, differences, stored_item.muted)
-        
-        query = Item.update(
-            item_id=found_item.id,
-            checker=self.__class__.__name__,
-            title=found_item.title,
-            stock=found_item.stock,
-            price=found_item.price,
-            buyout_price=found_item.buyout_price,
-            alert=self.alert,
-        ).where(Item.item_id == found_item.id)
-        query.execute()
+            self.updated_counter += 1
+            self.update_item(found_item, differences, stored_item.muted)
+
         self.up_to_date_counter += 1
+        if not differences and (
+            stored_item.title == found_item.title
+            and stored_item.stock == found_item.stock
+            and stored_item.price == found_item.price
+            and stored_item.buyout_price == found_item.buyout_price
+        ):
+            return None
+
+        return self.item_row(found_item)
         
-    async def update_item(self, item: AbstractItem, differences: list, muted: False) -> None:
+    def update_item(self, item: AbstractItem, differences: list, muted: False) -> None:
         info(f"[{self.__class__.__name__}] Item updated: {item.title}")
 
         if not muted:
-            message_id = await self.post_alert(item, differences)
-            query = Item.update(message_id=message_id).where(Item.item_id == item.id)
-            query.execute()
+            self.post_alert(item, differences)
             
-    async def new_item(self, item: AbstractItem) -> None:
-        info(f"[{self.__class__.__name__}] New item found: {item.title}")
-        message_id = await self.post_alert(item, [])
-
-        query = Item.insert(
-            item_id=item.id,
-            checker=self.__class__.__name__,
-            title=item.title,
-            stock=item.stock,
-            price=item.price,
-            buyout_price=item.buyout_price,
-            message_id=message_id,
-            found_at=datetime.now(),
-            updated_at=datetime.now(),
-            alert=self.alert,
-        )
-        query.execute()
-    
-    # def post_updates(self, updates: list):
-    #     embed = Embed()
-    #     embed.color = Color(0x00FF00)
-    #     embed.title = f"Updates for {self.alert['name']}"
-    #     embed.set_footer(f"Source: {self.__class__.__name__} — {self.alert['name']}")
+    async def new_item(self, item: AbstractItem) -> dict:
+        if self.baseline:
+            self.baseline_counter += 1
+            return self.item_row(item)
 
-    #     for update in updates:
-    #         changes = "\n".join(update.changes)
-    #         embed.add_field(update.item.title, changes, inline=False)
+        info(f"[{self.__class__.__name__}] New item found: {item.title}")
+        self.new_counter += 1
+        self.post_alert(item, [])
 
+        return self.item_row(item)
+    
     def create_embed(self, item: AbstractItem) -> Embed:
         embed = Embed()
         embed.color = self.get_embed_color()
@@ -185,22 +477,15 @@ class AlertChecker(ABC):
         embed.set_footer(f"Source: {self.__class__.__name__} — #{item.id} - {self.search_query}")
         return embed
     
-    async def post_alert(self, item: AbstractItem, differences: list) -> int:
+    def post_alert(self, item: AbstractItem, differences: list) -> None:
+        if self.baseline:
+            return
+
         embed = self.create_embed(item)
         if differences:
             embed.color = Color(0x00FF00) # Green
             for difference in differences:
                 embed.add_field("Update", difference, inline=False)
 
-            db_item = Item.select().where(Item.item_id == item.id)
-            notifications = Notification.select().where(Notification.item == db_item)
-            for notification in notifications:
-                user_id = notification.user_id
-                dm_channel = await self.bot.rest.create_dm_channel(user_id)
-                await self.bot.rest.create_message(dm_channel.id, embed=embed)
-
-        message = await self.bot.rest.create_message(self.channel_id, embed=embed)
-        await message.add_reaction('🗑️')
-        await message.add_reaction('🔔')
-
-        return message.id
\ No newline at end of file
+        priority = ITEM_UPDATE if differences else NEW_ITEM
+        self.outbox.append(OutboundPost(priority, self.channel_id, self.alert.id, item.id, embed, notify=bool(differences)))
@@ -0,0 +1,8 @@
+# strategies/components/base.py
+from abc import ABC, abstractmethod
+import hikari
+
+class ComponentActionStrategy(ABC):
+    @abstractmethod
+    async def execute(self, interaction: hikari.ComponentInteraction, item, bot):
+        pass
@@ -0,0 +1,18 @@
+# strategies/components/delete_item.py
+import hikari
+from .base import ComponentActionStrategy
+from logging import info
+import repositories
+from message_index import message_index
+
+class DeleteItemStrategy(ComponentActionStrategy):
+    async def execute(self, interaction: hikari.ComponentInteraction, item, bot):
+        await interaction.create_initial_response(hikari.ResponseType.DEFERRED_MESSAGE_UPDATE)
+
+        if item:
+            await repositories.blacklists.create(item, interaction.channel_id)
+            info(f"[{self.__class__.__name__}] Blacklisted item {item.item_id} after click by {interaction.user.id}.")
+
+        await bot.rest.delete_message(interaction.channel_id, interaction.message.id)
+        message_index.remove(interaction.message.id)
+        info(f"[{self.__class__.__name__}] Message {interaction.message.id} deleted after click.")
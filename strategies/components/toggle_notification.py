@@ -0,0 +1,23 @@
+# strategies/components/toggle_notification.py
+import hikari
+from .base import ComponentActionStrategy
+from logging import info
+import repositories
+
+class ToggleNotificationStrategy(ComponentActionStrategy):
+    """Subscribe the user to updates of the item, or unsubscribe when already subscribed."""
+    async def execute(self, interaction: hikari.ComponentInteraction, item, bot):
+        user_id = interaction.user.id
+        if item is None:
+            await interaction.create_initial_response(hikari.ResponseType.MESSAGE_CREATE, "This item is no longer tracked.", flags=hikari.MessageFlag.EPHEMERAL)
+            return
+
+        if await repositories.notifications.delete(item, user_id):
+            content = f"Notification removed for {item.title}."
+            info(f"[{self.__class__.__name__}] Notification deleted for {item.item_id} after click by {user_id}.")
+        else:
+            await repositories.notifications.create(item, user_id)
+            content = f"Notification set for {item.title}. Click again to remove it."
+            info(f"[{self.__class__.__name__}] Notification set for {item.item_id} after click by {user_id}.")
+
+        await interaction.create_initial_response(hikari.ResponseType.MESSAGE_CREATE, content, flags=hikari.MessageFlag.EPHEMERAL)
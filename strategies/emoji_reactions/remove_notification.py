@@ -2,7 +2,9 @@
 import hikari
 from .base import EmojiActionStrategy
 from logging import info
-from models import Item, Notification
+import repositories
+from direct_messages import dm_channels
+from message_index import message_index
 
 class RemoveNotificationStrategy(EmojiActionStrategy):
     async def execute(self, event: hikari.ReactionDeleteEvent, bot):
@@ -11,13 +13,9 @@ class RemoveNotificationStrategy(EmojiActionStrategy):
         message_id = event.message_id
         guild_id = event.guild_id
 
-        message = await bot.rest.fetch_message(channel_id, message_id)
-        dm_channel = await bot.rest.create_dm_channel(user_id)
-        if message.author.id == bot.get_me().id:
-            item = Item.select().where(Item.message_id == message_id).get()
-            if item:
-                notification = Notification.select().where(Notification.item == item, Notification.user_id == user_id).first()
-                if notification:
-                    notification.delete_instance()
-                    await bot.rest.create_message(dm_channel.id, f"Notification removed for Item https://discord.com/channels/{guild_id}/{channel_id}/{message_id}.")
-                    info(f"[{self.__class__.__name__}] Notification deleted for {item['name']} after reaction deletion by {event.user_id}.")
\ No newline at end of file
+        item = await message_index.find(message_id, channel_id)
+        if item:
+            if await repositories.notifications.delete(item, user_id):
+                dm_channel_id = await dm_channels.get(bot.rest, user_id)
+                await bot.rest.create_message(dm_channel_id, f"Notification removed for Item https://discord.com/channels/{guild_id}/{channel_id}/{message_id}.")
+                info(f"[{self.__class__.__name__}] Notification deleted for {item.item_id} after reaction deletion by {event.user_id}.")
\ No newline at end of file
@@ -1,62 +1,96 @@
 from dataclasses import dataclass
-import math
-import aiohttp
-from bs4 import BeautifulSoup
-from logging import error
+import asyncio
+import os
+from logging import warning
+from typing import Optional
+import lxml.html
 from hikari import Color
 from storechecker import AlertChecker, AbstractItem
+import repositories
+from search_results import SearchResult
 
-@dataclass
+@dataclass(slots=True)
 class SurugayaItem(AbstractItem):
     id: str
     stock: int = 0
     price: int = 0
     title: str = ''
     image_url: str = ''
-    end_time: None
+    end_time: None = None
 
     @property
     def url(self) -> str:
         return f"https://www.suruga-ya.jp/product/detail/{self.id}"
 
+def parse_item_title(page: str) -> Optional[str]:
+    """Extract the product title from a detail page.
+
+    Only the <h1 id="item_title"> element is handed to lxml instead of
+    building a tree for the whole page.
+    """
+    marker = page.find('id="item_title"')
+    if marker == -1:
+        return None
+
+    start = page.rfind('<h1', 0, marker)
+    end = page.find('</h1>', marker)
+    if start == -1 or end == -1:
+        return None
+
+    title = lxml.html.fragment_fromstring(page[start:end + len('</h1>')]).text_content().strip()
+    return title or None
+
 class SurugayaChecker(AlertChecker):
+    items_per_page = 24
+    page_concurrency_env = "SURUGAYA_PAGE_CONCURRENCY"
+    _detail_semaphore = None
+
     def get_embed_color(self) -> Color:
         return Color(0x0000FF) # Blue
     
-    async def fetch_items(self, session) -> list:
-        async def fetch(url):
-            async with session.get(url, headers=self.headers) as response:
-                return await response.json()
-        
-        content = await fetch(f"https://www.fromjapan.co.jp/japan/sites/surugaya/search?keyword={self.search_query}&sort=score&hits=24&page=1")
-        
-        if 'items' not in content:
-            error(f"Failed to fetch items for {self.search_query}")
-            error(content)
-
-        if not content.get("items"):
-            return []
-        
-        page_count = math.ceil(content["count"] / 24)
-        if page_count > 1:
-            for page in range(2, page_count + 1):
-                page_content = await fetch(f"https://www.fromjapan.co.jp/japan/sites/surugaya/search?keyword={self.search_query}&sort=score&hits=24&page={page}")
-                content["items"].extend(page_content["items"])
-
-        return content["items"]
-
-    async def normalize_item(self, data: dict) -> AbstractItem:
-        item = SurugayaItem(
-            id=data.get('id'),
-            stock=data.get('stock'),
-            price=data.get('price'),
-            title=data.get('title'),
-            image_url=data.get('imageUrl')
+    def search_url(self, page: int) -> str:
+        return f"https://www.fromjapan.co.jp/japan/sites/surugaya/search?keyword={self.query}&sort={self.sort}&hits={self.items_per_page}&page={page}"
+
+    async def normalize_item(self, data: SearchResult) -> AbstractItem:
+        return SurugayaItem(
+            id=data.id,
+            stock=data.stock or 0,
+            price=data.price or 0,
+            title=data.title,
+            image_url=data.image_url
         )
 
-        async with aiohttp.ClientSession() as session:
-            page_response = await session.get(item.url, headers=self.headers)
-            soup = BeautifulSoup(await page_response.text(), 'html.parser')
-            item.title = soup.find('h1', id="item_title").text.strip()
+    def detail_semaphore(self) -> asyncio.Semaphore:
+        """Semaphore capping concurrent detail page requests to suruga-ya.jp across all alerts."""
+        if SurugayaChecker._detail_semaphore is None:
+            SurugayaChecker._detail_semaphore = asyncio.Semaphore(int(os.getenv("SURUGAYA_DETAIL_CONCURRENCY", "4")))
+        return SurugayaChecker._detail_semaphore
+
+    async def fetch_title(self, item: SurugayaItem) -> Optional[str]:
+        try:
+            async with self.detail_semaphore():
+                page = await self.http.get_text(item.url, headers=self.headers)
+            return parse_item_title(page)
+        except Exception as e:
+            warning(f"[{self.__class__.__name__}] Failed to fetch title for {item.id}: {e}")
+            return None
+
+    async def enrich_items(self, items: list) -> None:
+        """Replace the API titles with the full titles from the product detail pages.
+
+        Titles are cached by item id, so only items we've never seen are fetched.
+        When a detail page can't be fetched or parsed the API title is kept.
+        """
+        titles = await repositories.titles.find_many([item.id for item in items])
+        missing = [item for item in items if item.id not in titles]
+
+        fetched_titles = {}
+        for item, title in zip(missing, await asyncio.gather(*(self.fetch_title(item) for item in missing))):
+            if title:
+                fetched_titles[item.id] = title
+
+        await repositories.titles.save_many(fetched_titles)
+        titles.update(fetched_titles)
 
-        return item
\ No newline at end of file
+        for item in items:
+            item.title = titles.get(item.id, item.title)
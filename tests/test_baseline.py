@@ -0,0 +1,72 @@
+"""The first scan of an alert is stored without posting, the scans after it post new listings."""
+import json
+import os
+import tempfile
+import unittest
+
+os.environ["DATABASE_URL"] = os.path.join(tempfile.mkdtemp(), "alerts.db")
+os.environ["HTTP_CACHE_PATH"] = ":memory:"
+
+import repositories
+from delivery import NEW_ITEM
+from http_client import HttpClient
+from yahoo import YahooAuctionsChecker
+
+class FakeHttpClient(HttpClient):
+    """Serves a single result page with the current listings."""
+    def __init__(self):
+        super().__init__()
+        self.listings = []
+
+    async def start(self) -> None:
+        await self.cache.open()
+
+    async def request(self, url: str, headers: dict, read):
+        items = [{"id": listing, "title": f"Listing {listing}", "price": 1000} for listing in self.listings]
+        return 200, {}, json.dumps({"items": items, "count": len(items)}).encode()
+
+class RecordingDelivery:
+    def __init__(self):
+        self.posts = []
+
+    async def enqueue(self, post) -> None:
+        self.posts.append(post)
+
+    async def enqueue_notice(self, channel_id: int, content: str) -> None:
+        pass
+
+class BaselineTest(unittest.IsolatedAsyncioTestCase):
+    @classmethod
+    def setUpClass(cls):
+        repositories.storage.setup()
+
+    async def asyncSetUp(self):
+        self.http = FakeHttpClient()
+        await self.http.start()
+        self.addAsyncCleanup(self.http.cache.close)
+        self.delivery = RecordingDelivery()
+
+    async def checker(self, search_query: str) -> YahooAuctionsChecker:
+        alert = await repositories.alerts.create(1, search_query)
+        return YahooAuctionsChecker(None, alert, self.http, self.delivery)
+
+    async def test_first_scan_is_not_posted(self):
+        checker = await self.checker("existing listings")
+        self.http.listings = ["a1", "a2"]
+        await checker.check_store()
+        self.assertEqual(self.delivery.posts, [])
+
+        self.http.listings = ["a1", "a2", "a3"]
+        await checker.check_store()
+        self.assertEqual([(post.item_id, post.priority) for post in self.delivery.posts], [("a3", NEW_ITEM)])
+
+    async def test_first_listing_after_empty_scan_is_posted(self):
+        checker = await self.checker("no listings yet")
+        await checker.check_store()
+
+        self.http.listings = ["b1"]
+        await checker.check_store()
+        self.assertEqual([(post.item_id, post.priority) for post in self.delivery.posts], [("b1", NEW_ITEM)])
+
+if __name__ == "__main__":
+    unittest.main()
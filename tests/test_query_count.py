@@ -0,0 +1,79 @@
+"""A check runs a fixed number of queries per page, however many items are on it."""
+import json
+import os
+import tempfile
+import unittest
+
+os.environ["DATABASE_URL"] = os.path.join(tempfile.mkdtemp(), "alerts.db")
+os.environ["HTTP_CACHE_PATH"] = ":memory:"
+
+import models
+import repositories
+from http_client import HttpClient
+from yahoo import YahooAuctionsChecker
+
+PAGES = 3
+
+class FakeHttpClient(HttpClient):
+    """Serves generated result pages instead of requesting them."""
+    def __init__(self, items_per_page: int):
+        super().__init__()
+        self.items_per_page = items_per_page
+        self.price = 5000
+
+    async def start(self) -> None:
+        await self.cache.open()
+
+    async def request(self, url: str, headers: dict, read):
+        page = int(url.rsplit("=", 1)[1])
+        items = [
+            {"id": f"{self.items_per_page}-{page}-{index}", "title": f"Item {index}", "price": self.price}
+            for index in range(self.items_per_page)
+        ]
+        body = json.dumps({"items": items, "count": PAGES * YahooAuctionsChecker.items_per_page}).encode()
+        return 200, {}, body
+
+class DiscardingDelivery:
+    async def enqueue(self, post) -> None:
+        pass
+
+    async def enqueue_notice(self, channel_id: int, content: str) -> None:
+        pass
+
+class QueryCountTest(unittest.IsolatedAsyncioTestCase):
+    @classmethod
+    def setUpClass(cls):
+        repositories.storage.setup()
+
+    def setUp(self):
+        self.queries = []
+        execute_sql = models.database.execute_sql
+
+        def counting_execute_sql(sql, params=None, *args, **kwargs):
+            self.queries.append(sql)
+            return execute_sql(sql, params, *args, **kwargs)
+
+        models.database.execute_sql = counting_execute_sql
+        self.addCleanup(setattr, models.database, "execute_sql", execute_sql)
+
+    async def count_check_queries(self, items_per_page: int) -> int:
+        """Queries run by a check in which every item on every page changed."""
+        http = FakeHttpClient(items_per_page)
+        await http.start()
+        self.addAsyncCleanup(http.cache.close)
+        alert = await repositories.alerts.create(1, f"query count {items_per_page}")
+        checker = YahooAuctionsChecker(None, alert, http, DiscardingDelivery())
+
+        await checker.check_store()
+        http.price = 1000
+        self.queries.clear()
+        await checker.check_store()
+
+        self.assertEqual(checker.updated_counter, PAGES * items_per_page)
+        return len(self.queries)
+
+    async def test_queries_do_not_grow_with_items_per_page(self):
+        self.assertEqual(await self.count_check_queries(5), await self.count_check_queries(90))
+
+if __name__ == "__main__":
+    unittest.main()
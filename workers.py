@@ -0,0 +1,151 @@
+import asyncio
+import logging
+import multiprocessing
+import os
+from logging import info, warning
+from delivery import DeliveryQueue, ChannelNotice
+from http_client import HttpClient
+from scheduler import AlertScheduler
+import repositories
+
+# Sent over a queue to tell the other side to stop
+STOP = None
+
+class EventForwarder:
+    """Takes the place of the DeliveryQueue in a worker process.
+
+    Posts are sent to the coordinator as they are, the embed included, so the
+    coordinator does nothing but deliver them.
+    """
+    def __init__(self, events: multiprocessing.Queue):
+        self.events = events
+
+    async def send(self, event) -> None:
+        # The queue is bounded, so putting may block until the coordinator catches up
+        await asyncio.get_running_loop().run_in_executor(None, self.events.put, event)
+
+    async def enqueue(self, post) -> None:
+        await self.send(post)
+
+    async def enqueue_notice(self, channel_id: int, content: str) -> None:
+        await self.send(ChannelNotice(channel_id, content))
+
+async def listen_for_commands(commands: multiprocessing.Queue, scheduler: AlertScheduler, stopped: asyncio.Event) -> None:
+    loop = asyncio.get_running_loop()
+    while True:
+        command = await loop.run_in_executor(None, commands.get)
+        if command is STOP:
+            stopped.set()
+            return
+
+        action, alert_id = command
+        if action == "sync":
+            await scheduler.sync_alerts()
+        elif action == "remove":
+            scheduler.remove_alert(alert_id)
+        elif action == "invalidate_filters":
+            scheduler.invalidate_filters(alert_id)
+
+async def run_worker(index: int, count: int, checkers: dict, events: multiprocessing.Queue, commands: multiprocessing.Queue) -> None:
+    repositories.storage.setup()
+    http = HttpClient()
+    await http.start()
+
+    scheduler = AlertScheduler(None, http, EventForwarder(events), checkers, shard=(index, count))
+    stopped = asyncio.Event()
+    tasks = [
+        asyncio.create_task(scheduler.run()),
+        asyncio.create_task(listen_for_commands(commands, scheduler, stopped)),
+    ]
+    try:
+        await stopped.wait()
+    finally:
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        await http.close()
+
+def worker_main(index: int, count: int, checkers: dict, events: multiprocessing.Queue, commands: multiprocessing.Queue) -> None:
+    """Entry point of a scraping worker process."""
+    logging.basicConfig(level=logging.INFO, format=f"%(levelname)s worker-{index} %(message)s")
+    # Workers sharing a cache file would each evict based on their own size count
+    cache_path = os.getenv("HTTP_CACHE_PATH", "http_cache.db")
+    if cache_path != ":memory:":
+        os.environ["HTTP_CACHE_PATH"] = f"{cache_path}.worker{index}"
+
+    asyncio.run(run_worker(index, count, checkers, events, commands))
+
+class WorkerPool:
+    """Runs the checks in WORKER_PROCESSES processes and posts their results.
+
+    Every worker schedules its own shard of the (alert, source) jobs and does
+    the fetching, parsing and diffing. The posts it produces come back over a
+    queue and go through this process's DeliveryQueue, so only this process
+    talks to Discord. Workers share the SQLite database, which is why this
+    mode doesn't work with ``memory://`` storage.
+
+    It offers the same ``add_alert``/``remove_alert``/``invalidate_filters``
+    as AlertScheduler, so the commands don't need to know which mode is running.
+    """
+    def __init__(self, delivery: DeliveryQueue, checkers: dict, count: int):
+        self.delivery = delivery
+        self.checkers = checkers
+        self.count = count
+        # Spawned, not forked: the parent has a running event loop and threads
+        self.context = multiprocessing.get_context("spawn")
+        self.events = self.context.Queue(int(os.getenv("WORKER_EVENT_QUEUE_SIZE", "1000")))
+        self.commands = [self.context.Queue() for _ in range(count)]
+        self.processes = []
+
+    def start(self) -> None:
+        for index in range(self.count):
+            process = self.context.Process(
+                target=worker_main,
+                args=(index, self.count, self.checkers, self.events, self.commands[index]),
+                name=f"worker-{index}",
+                daemon=True,
+            )
+            process.start()
+            self.processes.append(process)
+        info(f"[{self.__class__.__name__}] Started {self.count} worker processes")
+
+    async def run(self) -> None:
+        """Hand the posts coming from the workers to the delivery queue."""
+        loop = asyncio.get_running_loop()
+        while True:
+            event = await loop.run_in_executor(None, self.events.get)
+            if event is STOP:
+                return
+
+            if isinstance(event, ChannelNotice):
+                await self.delivery.enqueue_notice(event.channel_id, event.content)
+            else:
+                await self.delivery.enqueue(event)
+
+    def add_alert(self, alert) -> None:
+        # The alert is already stored, the workers pick it up from the database
+        for commands in self.commands:
+            commands.put(("sync", alert.id))
+
+    def remove_alert(self, alert_id: int) -> None:
+        for commands in self.commands:
+            commands.put(("remove", alert_id))
+
+    def invalidate_filters(self, alert_id: int) -> None:
+        # Every process has its own filter cache
+        for commands in self.commands:
+            commands.put(("invalidate_filters", alert_id))
+
+    async def close(self) -> None:
+        for commands in self.commands:
+            commands.put(STOP)
+
+        loop = asyncio.get_running_loop()
+        # The events queue is bounded, putting may block until run() makes room
+        await loop.run_in_executor(None, self.events.put, STOP)
+        for process in self.processes:
+            await loop.run_in_executor(None, process.join, 10)
+            if process.is_alive():
+                warning(f"[{self.__class__.__name__}] {process.name} didn't stop, terminating it")
+                process.terminate()
+        self.processes.clear()
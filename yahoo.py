@@ -1,12 +1,10 @@
 from dataclasses import dataclass
-import math
-from logging import error
 from hikari import Color
-import math
 
 from storechecker import AlertChecker, AbstractItem
+from search_results import SearchResult
 
-@dataclass
+@dataclass(slots=True)
 class YahooAuctionItem(AbstractItem):
     id: str
     stock: int = 1
@@ -20,37 +18,20 @@ class YahooAuctionItem(AbstractItem):
         return f"https://buyee.jp/item/yahoo/auction/{self.id}"
 
 class YahooAuctionsChecker(AlertChecker):
+    items_per_page = 99
+    page_concurrency_env = "YAHOO_AUCTION_PAGE_CONCURRENCY"
+
     def get_embed_color(self) -> Color:
         return Color(0xFFA500) # Orange
 
-    async def fetch_items(self, session) -> list:
-        async def fetch(url):
-            async with session.get(url, headers=self.headers) as response:
-                return await response.json()
-
-        items_per_page = 99
-        content = await fetch(f"https://www.fromjapan.co.jp/japan/sites/yahooauction/search?keyword={self.search_query}&sort=score&hits={items_per_page}&page=1")
-        
-        if 'items' not in content:
-            error(f"Failed to fetch items for {self.search_query}")
-            error(content)
-
-        if not content.get("items"):
-            return []
-        
-        page_count = math.ceil(content["count"] / items_per_page)
-        if page_count > 1:
-            for page in range(2, page_count + 1):
-                page_content = await fetch(f"https://www.fromjapan.co.jp/japan/sites/yahooauction/search?keyword={self.search_query}&sort=score&hits={items_per_page}&page={page}")
-                content["items"].extend(page_content["items"])
-
-        return content["items"]
+    def search_url(self, page: int) -> str:
+        return f"https://www.fromjapan.co.jp/japan/sites/yahooauction/search?keyword={self.query}&sort={self.sort}&hits={self.items_per_page}&page={page}"
 
-    async def normalize_item(self, data: dict) -> AbstractItem:
+    async def normalize_item(self, data: SearchResult) -> AbstractItem:
         return YahooAuctionItem(
-            id=data.get('id'),
-            image_url=data.get('imageUrl'),
-            title=data.get('title', 'Unknown Title'),
-            price=data.get('price'),
-            buyout_price=data.get('buyItNowPrice'),
+            id=data.id,
+            image_url=data.image_url,
+            title=data.title or 'Unknown Title',
+            price=data.price or 0,
+            buyout_price=data.buy_it_now_price or 0,
         )
\ No newline at end of file